@@ -0,0 +1,304 @@
+import argparse
+import time
+from collections import Counter, deque
+
+from engine import Direction, SnakeEngine
+from grid import OBSTACLE
+
+# Move order matches the neighbour table built by Autopilot
+MOVES = (Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT)
+REVERSE_MOVE = (1, 0, 3, 2)
+
+
+class Autopilot:
+    """Steers a SnakeEngine towards the food along shortest grid paths.
+
+    Paths are found with a breadth-first search over the wrap-around cell
+    grid. A body segment counts as an obstacle only until the tail has moved
+    off it, so the snake may plan through cells that will be free by the time
+    its head gets there. The path to the food is cached and followed step by
+    step; it is only recomputed when the food moves, the level changes, the
+    snake leaves the path or the next cell turns out to be blocked.
+
+    Before committing to a path, a safety check replays it on a copy of the
+    body and makes sure the head can still reach the tail afterwards. When it
+    cannot (or there is no path), the snake chases its own tail, and failing
+    that moves towards the largest open area; the food is retried every
+    ``retry_interval`` steps while following the tail.
+    """
+
+    def __init__(self, engine, safety_check=True, retry_interval=4):
+        self.engine = engine
+        self.safety_check = safety_check
+        self.retry_interval = retry_interval
+
+        self.neighbours = None
+        self.layout = None
+        self.path = deque()
+        self.target = None
+        self.version = None
+        self.expected_head = None
+        self.hold = 0
+
+        self.decisions = 0
+        self.cache_hits = 0
+        self.replans = 0
+        self.fallbacks = 0
+
+    def build_neighbours(self):
+        cols, rows = self.engine.cols, self.engine.rows
+        self.neighbours = []
+        for i in range(cols * rows):
+            cx, cy = i % cols, i // cols
+            self.neighbours.append((
+                ((cy - 1) % rows) * cols + cx,
+                ((cy + 1) % rows) * cols + cx,
+                cy * cols + (cx - 1) % cols,
+                cy * cols + (cx + 1) % cols,
+            ))
+        self.layout = (cols, rows)
+
+    def reset(self):
+        self.path.clear()
+        self.target = None
+        self.expected_head = None
+        self.hold = 0
+
+    def heading(self):
+        """Index into MOVES of the current direction of travel, or None."""
+        engine = self.engine
+        if engine.y1_change < 0:
+            return 0
+        if engine.y1_change > 0:
+            return 1
+        if engine.x1_change < 0:
+            return 2
+        if engine.x1_change > 0:
+            return 3
+        return None
+
+    def body_timing(self):
+        """Map each body cell to the step at which the head may enter it."""
+        engine = self.engine
+        growth = engine.length_of_snake - len(engine.snake)
+        index = engine.grid.index
+        return {index(*cell): j + 1 + growth for j, cell in enumerate(engine.snake)}
+
+    def search(self, start, goal, free_at, heading=None):
+        """Shortest path from start to goal as a list of cells, or None.
+
+        ``free_at`` maps occupied cells to the first step at which they may
+        be entered; obstacles are never entered and the move reversing
+        ``heading`` is not allowed on the first step.
+        """
+        kinds = self.engine.grid.kinds
+        neighbours = self.neighbours
+        forbidden = REVERSE_MOVE[heading] if heading is not None else None
+        parent = {start: None}
+        frontier = [start]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for cell in frontier:
+                for move, nxt in enumerate(neighbours[cell]):
+                    if nxt in parent or kinds[nxt] == OBSTACLE or free_at.get(nxt, 0) > depth:
+                        continue
+                    if cell == start and move == forbidden:
+                        continue
+                    parent[nxt] = cell
+                    if nxt == goal:
+                        path = []
+                        while nxt != start:
+                            path.append(nxt)
+                            nxt = parent[nxt]
+                        path.reverse()
+                        return path
+                    next_frontier.append(nxt)
+            frontier = next_frontier
+        return None
+
+    def open_area(self, start, free_at, limit):
+        """Count cells reachable from start, stopping once ``limit`` is reached."""
+        kinds = self.engine.grid.kinds
+        neighbours = self.neighbours
+        seen = {start}
+        frontier = [start]
+        depth = 0
+        while frontier and len(seen) < limit:
+            depth += 1
+            next_frontier = []
+            for cell in frontier:
+                for nxt in neighbours[cell]:
+                    if nxt in seen or kinds[nxt] == OBSTACLE or free_at.get(nxt, 0) > depth:
+                        continue
+                    seen.add(nxt)
+                    next_frontier.append(nxt)
+            frontier = next_frontier
+        return len(seen)
+
+    def leaves_escape(self, path):
+        """Whether the tail is still reachable once the snake has eaten at the end of path."""
+        engine = self.engine
+        index = engine.grid.index
+        cells = [index(*cell) for cell in engine.snake]
+        size = min(len(cells) + len(path), engine.length_of_snake)
+        body = (cells + path)[-size:]
+        if len(body) < 2:
+            return True
+        # Eating adds one segment, so the tail stays put for one more step
+        growth = engine.length_of_snake + 1 - size
+        free_at = {cell: j + 1 + growth for j, cell in enumerate(body)}
+        head, tail = body[-1], body[0]
+        return self.search(head, tail, free_at) is not None
+
+    def plan(self, head, food, free_at, heading):
+        path = self.search(head, food, free_at, heading)
+        if path is not None and (not self.safety_check or self.leaves_escape(path)):
+            return path
+        return None
+
+    def fallback_path(self, head, free_at, heading):
+        """A path to the tail, or a single move into the most open space."""
+        engine = self.engine
+        tail = engine.grid.index(*engine.snake.tail)
+        if tail != head:
+            path = self.search(head, tail, free_at, heading)
+            if path is not None:
+                return path
+
+        kinds = engine.grid.kinds
+        forbidden = REVERSE_MOVE[heading] if heading is not None else None
+        limit = len(engine.snake) + 1
+        best, best_area = None, 0
+        for move, nxt in enumerate(self.neighbours[head]):
+            if move == forbidden or kinds[nxt] == OBSTACLE or free_at.get(nxt, 0) > 1:
+                continue
+            area = self.open_area(nxt, free_at, limit)
+            if area > best_area:
+                best, best_area = nxt, area
+        return [best] if best is not None else None
+
+    def enterable(self, cell):
+        """Whether the head can move into ``cell`` on the next step."""
+        engine = self.engine
+        grid = engine.grid
+        if grid.kinds[cell] == OBSTACLE:
+            return False
+        if grid.snake[cell] == 0:
+            return True
+        # Only the tail, and only if it moves off this step
+        return (grid.snake[cell] == 1 and grid.index(*engine.snake.tail) == cell
+                and len(engine.snake) >= engine.length_of_snake)
+
+    def decide(self):
+        """Return the Direction to take on the next step, or None to keep going."""
+        engine = self.engine
+        if self.layout != (engine.cols, engine.rows):
+            self.build_neighbours()
+            self.reset()
+        if self.version != engine.level_version:
+            self.version = engine.level_version
+            self.reset()
+        self.decisions += 1
+
+        grid = engine.grid
+        head = grid.index(*engine.snake.head)
+        food = grid.index(*engine.to_cell(engine.foodx, engine.foody))
+
+        if (self.path and self.target == food and head == self.expected_head
+                and self.enterable(self.path[0])):
+            self.cache_hits += 1
+            nxt = self.path.popleft()
+        else:
+            heading = self.heading()
+            free_at = self.body_timing()
+            path = None
+            hold = self.hold
+            if hold > 0:
+                # Chasing the tail: only try the food again every few steps
+                hold -= 1
+            else:
+                self.replans += 1
+                path = self.plan(head, food, free_at, heading)
+                hold = self.retry_interval - 1
+            if path is not None:
+                self.path = deque(path)
+                self.target = food
+                nxt = self.path.popleft()
+            else:
+                # The tail moves every step, so this path is never cached
+                self.fallbacks += 1
+                self.reset()
+                path = self.fallback_path(head, free_at, heading)
+                self.hold = hold
+                if path is None:
+                    return None
+                nxt = path[0]
+
+        self.expected_head = nxt
+        return MOVES[self.neighbours[head].index(nxt)]
+
+    def steer(self):
+        """Decide and apply the next direction to the engine."""
+        direction = self.decide()
+        if direction is not None:
+            self.engine.update_snake_direction(direction)
+        return direction
+
+    def stats(self):
+        return {
+            'decisions': self.decisions,
+            'cache_hits': self.cache_hits,
+            'replans': self.replans,
+            'fallbacks': self.fallbacks,
+            'hit_ratio': self.cache_hits / self.decisions if self.decisions else 0.0,
+        }
+
+
+def soak(games, width, height, max_steps, seed):
+    """Play ``games`` headless rounds on autopilot and summarise how they ended."""
+    engine = SnakeEngine(width, height)
+    pilot = Autopilot(engine)
+    outcomes = Counter()
+    scores = []
+    steps = 0
+    start = time.perf_counter()
+    for game in range(games):
+        engine.init_game_variables(seed=seed + game)
+        for _ in range(max_steps):
+            steps += 1
+            if not engine.step(pilot.decide()):
+                break
+        if engine.board_full:
+            outcomes['board full'] += 1
+        elif engine.game_close:
+            outcomes['crashed'] += 1
+        else:
+            outcomes['step limit'] += 1
+        scores.append(engine.score)
+    return outcomes, scores, steps, time.perf_counter() - start, pilot.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play headless games on autopilot.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--max-steps", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    outcomes, scores, steps, elapsed, stats = soak(
+        args.games, args.width, args.height, args.max_steps, args.seed)
+    print(f"{args.games} games, {steps} steps in {elapsed:.2f}s "
+          f"({steps / max(elapsed, 1e-9):.0f} decisions/s)")
+    print(f"score avg={sum(scores) / len(scores):.0f} max={max(scores)}")
+    print(f"cache hits={stats['hit_ratio']:.0%} replans={stats['replans']} "
+          f"fallbacks={stats['fallbacks']}")
+    for name, count in outcomes.most_common():
+        print(f"  {name:<10} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# Benchmarks never open a real window or audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from autopilot import Autopilot
+from engine import Direction, SnakeEngine
+from grid import EMPTY, OBSTACLE
+
+SNAKE_LENGTHS = [10, 100, 1000]
+OBSTACLE_COUNTS = [10, 100, 500]
+BOARD_FILL = [0.5, 0.9, 0.99]
+RESOLUTIONS = [(800, 600), (1920, 1080), (3840, 2160)]
+GESTURE_STREAM = 1000
+WORLD_SIZES = [(200, 200), (2000, 2000), (20000, 20000)]
+
+
+def measure(func, number, repeat):
+    """Time ``func`` and return per-call statistics in microseconds."""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        'median_us': statistics.median(rounds),
+        'mean_us': statistics.fmean(rounds),
+        'min_us': min(rounds),
+        'max_us': max(rounds),
+        'calls': number * repeat,
+    }
+
+
+def lay_out_snake(engine, length):
+    """Give the engine a snake of ``length`` cells along a serpentine path."""
+    engine.snake.clear()
+    engine.grid.clear()
+    engine.obstacles = []
+    engine.power_ups = []
+    cells = []
+    for cy in range(engine.rows):
+        row = range(engine.cols) if cy % 2 == 0 else range(engine.cols - 1, -1, -1)
+        cells.extend((cx, cy) for cx in row)
+        if len(cells) >= length:
+            break
+    for cell in cells[:length]:
+        engine.snake.push_head(cell)
+        engine.grid.add_snake(*cell)
+    engine.length_of_snake = length
+    engine.x1, engine.y1 = engine.to_pixels(*engine.snake.head)
+    engine.foodx, engine.foody = engine.spawn_food()
+
+
+def bench_tick(number, repeat):
+    results = {}
+    engine = SnakeEngine(3840, 2160)
+    for length in SNAKE_LENGTHS:
+        for count in OBSTACLE_COUNTS:
+            engine.init_game_variables(seed=0)
+            lay_out_snake(engine, length)
+            engine.obstacles = engine.generate_obstacles(count)
+            engine.update_snake_direction(Direction.DOWN)
+
+            def tick():
+                engine.update_snake_position()
+                engine.check_collisions()
+
+            results[f"tick/len={length}/obstacles={count}"] = measure(tick, number, repeat)
+    return results
+
+
+def bench_spawn(number, repeat):
+    results = {}
+    engine = SnakeEngine(1920, 1080)
+    for fill in BOARD_FILL:
+        engine.init_game_variables(seed=0)
+        rng = random.Random(0)
+        while engine.grid.free_count > engine.grid.size * (1 - fill):
+            engine.grid.set_kind(*engine.grid.random_free(rng), OBSTACLE)
+
+        def spawn():
+            x, y = engine.spawn_food()
+            engine.grid.set_kind(*engine.to_cell(x, y), EMPTY)
+
+        results[f"spawn_food/fill={fill}"] = measure(spawn, number, repeat)
+    return results
+
+
+def bench_render(number, repeat):
+    from main import GameState
+
+    results = {}
+    for width, height in RESOLUTIONS:
+        game = GameState(width, height)
+        game.init_game_variables(seed=0)
+        lay_out_snake(game, 100)
+        game.obstacles = game.generate_obstacles(10)
+        game.update_snake_direction(Direction.DOWN)
+
+        def full_frame():
+            game.step()
+            game.draw_game_objects()
+            game.display_game_info()
+
+        def dirty_frame():
+            game.step()
+            game.renderer.render()
+
+        results[f"render/full/{width}x{height}"] = measure(full_frame, number, repeat)
+        results[f"render/dirty/{width}x{height}"] = measure(dirty_frame, number, repeat)
+    pygame.quit()
+    return results
+
+
+class SyntheticLandmark:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+
+class SyntheticHand:
+    def __init__(self, landmarks):
+        self.landmark = landmarks
+
+
+def synthetic_hand_stream(count, seed=0):
+    """Hands whose index finger points in a slowly changing direction."""
+    rng = random.Random(seed)
+    hands = []
+    dx, dy = 0.0, -0.2
+    for i in range(count):
+        if i % 50 == 0:
+            dx, dy = rng.choice([(0.0, -0.2), (0.0, 0.2), (-0.2, 0.0), (0.2, 0.0), (0.02, 0.03)])
+        landmarks = [SyntheticLandmark(0.5 + rng.gauss(0, 0.01), 0.5 + rng.gauss(0, 0.01))
+                     for _ in range(21)]
+        mcp = landmarks[5]
+        landmarks[8] = SyntheticLandmark(mcp.x + dx + rng.gauss(0, 0.03),
+                                         mcp.y + dy + rng.gauss(0, 0.03))
+        hands.append(SyntheticHand(landmarks))
+    return hands
+
+
+def bench_gesture(number, repeat):
+    from main import GameState
+
+    from gestures import sample_from_landmarks
+
+    game = GameState(800, 600)
+    stream = synthetic_hand_stream(GESTURE_STREAM)
+
+    def classify_stream():
+        # The path process_hand_results takes for every detected hand
+        for hand in stream:
+            game.gesture_filter.process(sample_from_landmarks(hand))
+
+    result = measure(classify_stream, max(1, number // 100), repeat)
+    for key in ('median_us', 'mean_us', 'min_us', 'max_us'):
+        result[key] /= len(stream)
+    result['calls'] *= len(stream)
+    pygame.quit()
+    return {"gesture/filter_chain": result}
+
+
+def bench_autopilot(number, repeat):
+    results = {}
+    for width, height in RESOLUTIONS[:2]:
+        engine = SnakeEngine(width, height)
+        pilot = Autopilot(engine)
+        engine.init_game_variables(seed=0)
+
+        def play():
+            if not engine.step(pilot.decide()):
+                engine.init_game_variables()
+
+        results[f"autopilot/play/{width}x{height}"] = measure(play, number, repeat)
+
+    engine = SnakeEngine(1920, 1080)
+    pilot = Autopilot(engine)
+    for length in SNAKE_LENGTHS[:2]:
+        engine.init_game_variables(seed=0)
+        lay_out_snake(engine, length)
+        engine.update_snake_direction(Direction.DOWN)
+
+        def replan():
+            pilot.reset()
+            pilot.decide()
+
+        results[f"autopilot/replan/len={length}"] = measure(replan, number, repeat)
+    return results
+
+
+def bench_world(number, repeat):
+    from main import GameState
+
+    results = {}
+    for cols, rows in WORLD_SIZES:
+        game = GameState(1920, 1080, world_size=(cols, rows))
+        game.init_game_variables(seed=0)
+        game.update_snake_direction(Direction.RIGHT)
+
+        def frame():
+            if not game.step():
+                game.init_game_variables()
+                game.update_snake_direction(Direction.RIGHT)
+            game.renderer.render(0.5)
+
+        results[f"world/frame/{cols}x{rows}"] = measure(frame, number, repeat)
+    pygame.quit()
+    return results
+
+
+def bench_startup(number, repeat):
+    # A fresh interpreter per call, so imports are not already cached
+    command = [sys.executable, "-c", "import main"]
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def import_main():
+        subprocess.run(command, cwd=here, check=True, stdout=subprocess.DEVNULL)
+
+    return {"startup/import_main": measure(import_main, max(1, number // 100), repeat)}
+
+
+SUITES = {
+    'tick': bench_tick,
+    'spawn': bench_spawn,
+    'render': bench_render,
+    'gesture': bench_gesture,
+    'autopilot': bench_autopilot,
+    'world': bench_world,
+    'startup': bench_startup,
+}
+
+
+def run(suites, number, repeat):
+    results = {}
+    for name in suites:
+        print(f"running {name}...", file=sys.stderr)
+        results.update(SUITES[name](number, repeat))
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pygame': pygame.version.ver,
+            'number': number,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Return (name, baseline_us, current_us, ratio) rows and the regressions."""
+    rows = []
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['median_us'] / base['median_us'] if base['median_us'] else float('inf')
+        row = (name, base['median_us'], result['median_us'], ratio)
+        rows.append(row)
+        if ratio > 1 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="run benchmarks and write JSON results")
+    compare_parser = sub.add_parser('compare', help="compare results against a baseline")
+    compare_parser.add_argument('baseline', help="baseline results JSON")
+    compare_parser.add_argument('current', nargs='?',
+                                help="results JSON to check (default: run benchmarks now)")
+    compare_parser.add_argument('--threshold', type=float, default=0.15,
+                                help="allowed slowdown before flagging, as a fraction")
+    for p in (run_parser, compare_parser):
+        p.add_argument('--suite', action='append', choices=sorted(SUITES),
+                       help="suite to run (repeatable, default: all)")
+        p.add_argument('--number', type=int, default=200, help="calls per timing round")
+        p.add_argument('--repeat', type=int, default=5, help="timing rounds per case")
+        p.add_argument('--out', help="write results JSON here")
+    args = parser.parse_args()
+
+    suites = args.suite or list(SUITES)
+    if args.command == 'compare' and args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run(suites, args.number, args.repeat)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.command == 'run':
+        if not args.out:
+            json.dump(current, sys.stdout, indent=2)
+            print()
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows, regressions = compare(baseline, current, args.threshold)
+    for name, base, now, ratio in rows:
+        flag = "  REGRESSION" if ratio > 1 + args.threshold else ""
+        print(f"{name:<40} {base:>10.2f}us -> {now:>10.2f}us  x{ratio:.2f}{flag}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+from collections import deque
+
+
+class SnakeBody:
+    """Snake segments as a deque of integer cells plus a cell -> count map.
+
+    The head is the right end of the deque and the tail the left end, so
+    advancing is an O(1) append/popleft, and ``cell in body`` is an O(1)
+    dict lookup regardless of the snake's length. Counts (rather than a plain
+    set) let segments overlap while the snake is invincible.
+    """
+
+    def __init__(self):
+        self.segments = deque()
+        self.cells = {}
+
+    def clear(self):
+        self.segments.clear()
+        self.cells.clear()
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def __contains__(self, cell):
+        return cell in self.cells
+
+    @property
+    def head(self):
+        return self.segments[-1]
+
+    @property
+    def tail(self):
+        return self.segments[0]
+
+    def push_head(self, cell):
+        self.segments.append(cell)
+        self.cells[cell] = self.cells.get(cell, 0) + 1
+
+    def pop_tail(self):
+        cell = self.segments.popleft()
+        count = self.cells[cell] - 1
+        if count:
+            self.cells[cell] = count
+        else:
+            del self.cells[cell]
+        return cell
@@ -0,0 +1,262 @@
+import threading
+import time
+
+
+class LatestValue:
+    """Single-slot mailbox: writers overwrite, readers only see the newest item."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._version = 0
+        self._read_version = 0
+        self.dropped = 0
+
+    def put(self, value):
+        with self._cond:
+            if self._version != self._read_version:
+                # The previous item was never read; it is replaced.
+                self.dropped += 1
+            self._value = value
+            self._version += 1
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Wait for an unread item and return it, or None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._version != self._read_version, timeout):
+                return None
+            self._read_version = self._version
+            return self._value
+
+    def poll(self):
+        """Return the newest unread item without blocking, else None."""
+        with self._cond:
+            if self._version == self._read_version:
+                return None
+            self._read_version = self._version
+            return self._value
+
+
+class FrameRing:
+    """Preallocated frames handed from one writer thread to one reader thread.
+
+    The writer fills the slot returned by ``back`` and then ``publish``es
+    it; the reader takes the newest published slot with ``get`` or ``poll``
+    and may use it until it takes another. With three slots there is always
+    one that is neither waiting to be read nor being read, so frames are
+    reused in place without copies and without tearing. Slots start as None
+    unless ``frames`` are given; the writer may fill them on first use.
+    """
+
+    def __init__(self, frames=None, count=3):
+        self.frames = list(frames) if frames is not None else [None] * count
+        self.stamps = [0.0] * len(self.frames)
+        self._cond = threading.Condition()
+        self._latest = None
+        self._reading = None
+        self._pending = False
+        self.dropped = 0
+
+    def back(self):
+        """Index of a slot the reader is not using and will not be handed next."""
+        with self._cond:
+            busy = (self._latest, self._reading)
+        for index in range(len(self.frames)):
+            if index not in busy:
+                return index
+
+    def publish(self, index, stamp=0.0):
+        with self._cond:
+            if self._pending:
+                # The previous frame was never read; it is replaced.
+                self.dropped += 1
+            self.stamps[index] = stamp
+            self._latest = index
+            self._pending = True
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Wait for an unread frame and return its index, or None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._pending, timeout):
+                return None
+            self._pending = False
+            self._reading = self._latest
+            return self._reading
+
+    def poll(self):
+        """Index of the newest unread frame without blocking, else None."""
+        with self._cond:
+            if not self._pending:
+                return None
+            self._pending = False
+            self._reading = self._latest
+            return self._reading
+
+
+class StageStats:
+    """Running latency figures for one pipeline stage, in milliseconds."""
+
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.count = 0
+        self.last = 0.0
+        self.average = 0.0
+        self.worst = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        ms = seconds * 1000.0
+        with self._lock:
+            self.count += 1
+            self.last = ms
+            if self.count == 1:
+                self.average = ms
+            else:
+                self.average += self.smoothing * (ms - self.average)
+            self.worst = max(self.worst, ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {'count': self.count, 'last_ms': self.last,
+                    'avg_ms': self.average, 'max_ms': self.worst}
+
+
+class GesturePipeline:
+    """Runs camera capture and hand inference on worker threads.
+
+    The capture thread reads frames into a FrameRing, decoding each one into
+    a reused buffer; the inference thread always processes the newest frame
+    (older ones are dropped) and publishes the resulting direction into a
+    latest-value slot. The game loop calls ``poll_direction`` which never
+    blocks.
+
+    ``tracker_factory`` builds an AdaptiveHandTracker (wrapping MediaPipe
+    Hands) inside the inference thread, and ``on_results(results)`` turns its
+    output into a Direction (or None when there is nothing to report). Frames
+    the tracker skips publish nothing, so the last direction stays in effect.
+    An optional FrameProfiler receives the camera and inference spans.
+
+    While ``preview`` is set to a FrameRing of preallocated RGB frames, the
+    tracker also draws every frame it sees, with its landmarks, into that
+    ring; with no preview nothing is drawn.
+    """
+
+    def __init__(self, cap, tracker_factory, on_results, profiler=None, preview=None):
+        self.cap = cap
+        self.tracker_factory = tracker_factory
+        self.tracker = None
+        self.on_results = on_results
+        self.profiler = profiler
+        self.preview = preview
+
+        self.frames = FrameRing()
+        self.directions = LatestValue()
+        self.stats = {
+            'capture': StageStats(),
+            'inference': StageStats(),
+            'classify': StageStats(),
+            'end_to_end': StageStats(),
+        }
+        self.failed_reads = 0
+
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.cap.release()
+
+    def poll_direction(self):
+        return self.directions.poll()
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            index = self.frames.back()
+            buffer = self.frames.frames[index]
+            # Decode into the slot's buffer; the first read of a slot allocates it
+            if buffer is None:
+                ret, frame = self.cap.read()
+            else:
+                ret, frame = self.cap.read(buffer)
+            if not ret:
+                self.failed_reads += 1
+                time.sleep(0.01)
+                continue
+            end = time.perf_counter()
+            self.stats['capture'].add(end - start)
+            if self.profiler is not None:
+                self.profiler.add('camera', start, end)
+            self.frames.frames[index] = frame
+            self.frames.publish(index, start)
+
+    def _inference_loop(self):
+        with self.tracker_factory() as tracker:
+            self.tracker = tracker
+            while not self._stop.is_set():
+                index = self.frames.get(timeout=0.1)
+                if index is None:
+                    continue
+                frame = self.frames.frames[index]
+                captured_at = self.frames.stamps[index]
+
+                start = time.perf_counter()
+                results = tracker.process(frame)
+                inferred = time.perf_counter()
+                if results is not None:
+                    direction = self.on_results(results)
+                    done = time.perf_counter()
+
+                    self.stats['inference'].add(inferred - start)
+                    self.stats['classify'].add(done - inferred)
+                    if self.profiler is not None:
+                        self.profiler.add('inference', start, inferred)
+                    if direction is not None:
+                        self.stats['end_to_end'].add(done - captured_at)
+                        self.directions.put(direction)
+
+                # Skipped frames are previewed too, with the last landmarks
+                preview = self.preview
+                if preview is not None:
+                    slot = preview.back()
+                    tracker.draw_preview(frame, preview.frames[slot])
+                    preview.publish(slot, captured_at)
+
+    def report(self):
+        report = {name: stage.snapshot() for name, stage in self.stats.items()}
+        report['dropped_frames'] = self.frames.dropped
+        report['dropped_directions'] = self.directions.dropped
+        report['failed_reads'] = self.failed_reads
+        if self.tracker is not None:
+            report['tracker'] = self.tracker.stats()
+        return report
+
+    def format_report(self):
+        report = self.report()
+        lines = ["Gesture pipeline:"]
+        for name in self.stats:
+            stage = report[name]
+            lines.append(f"  {name:<11} n={stage['count']:<6} avg={stage['avg_ms']:.1f}ms "
+                         f"last={stage['last_ms']:.1f}ms max={stage['max_ms']:.1f}ms")
+        lines.append(f"  dropped frames={report['dropped_frames']} "
+                     f"dropped directions={report['dropped_directions']} "
+                     f"failed reads={report['failed_reads']}")
+        if 'tracker' in report:
+            tracker = report['tracker']
+            lines.append(f"  inferences={tracker['processed']} skipped={tracker['skipped']} "
+                         f"cropped={tracker['cropped']} avg pixels={tracker['avg_pixels']:.0f}")
+        return "\n".join(lines)
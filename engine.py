@@ -0,0 +1,543 @@
+import random
+from collections import Counter
+from enum import Enum
+
+import numpy as np
+
+from body import SnakeBody
+from grid import EMPTY, FOOD, OBSTACLE, POWER_UP, BoardFullError, OccupancyGrid
+from levels import LevelCache
+from scheduler import EventScheduler
+from world import ChunkedGrid
+
+
+class Direction(Enum):
+    UP = 1
+    DOWN = 2
+    LEFT = 3
+    RIGHT = 4
+    NEUTRAL = 5
+
+
+class PowerUpType(Enum):
+    SPEED = 1
+    SLOW = 2
+    INVINCIBILITY = 3
+    DOUBLE_POINTS = 4
+
+
+class SnakeEngine:
+    """Snake rules with no display or input dependencies.
+
+    The board is a grid of ``snake_block``-sized cells; positions exposed to
+    the renderer (``x1``, ``foodx``, obstacles, power-up positions) are the
+    pixel coordinates of those cells.
+
+    All randomness comes from ``self.rng`` and all timers run on the logical
+    ``game_time`` clock, which advances by one step length per tick, so a
+    game is fully determined by its seed and its per-tick inputs.
+    """
+
+    def __init__(self, width, height, snake_block=None, food_size=None, base_speed=20, seed=None,
+                 world_size=None):
+        self.width = width
+        self.height = height
+
+        # Randomness and logical time
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.game_time = 0.0
+        self.ticks = 0
+
+        # Timed events (power-up expiry, despawn, spawns) on the game clock
+        self.scheduler = EventScheduler()
+        self.power_up_events = {}
+
+        # Game settings
+        self.snake_block = snake_block or max(25, self.width // 80)
+        self.food_size = food_size or max(25, self.width // 100)
+        self.base_speed = base_speed
+        self.snake_speed = self.base_speed
+
+        # Board grid: the screen's worth of cells, or in world mode a
+        # (cols, rows) world bigger than the screen, built chunk by chunk
+        self.world = world_size is not None
+        if self.world:
+            self.cols, self.rows = world_size
+            self.grid = ChunkedGrid(self.cols, self.rows)
+        else:
+            self.cols = self.width // self.snake_block
+            self.rows = self.height // self.snake_block
+            self.grid = OccupancyGrid(self.cols, self.rows)
+
+        # Obstacle layout: None scatters 10 random obstacles each round, or
+        # a dict of level parameters (see levels.py) for a generated level
+        self.level = None
+        self.level_cache = LevelCache()
+
+        # Game state
+        self.power_ups = []
+        self.current_power_ups = set()
+        self.power_up_timers = {}
+        self.power_ups_collected = Counter()  # PowerUpType -> pick-ups this round
+        self.obstacles = []
+        self.game_over = False
+        self.game_close = False
+        self.board_full = False
+        self.death_cause = None  # 'obstacle', 'self' or 'board_full' once the round ends
+        self.paused = False
+        self.score = 0
+        self.snake = SnakeBody()
+        self.prev_head = None
+        self.prev_tail = None
+        self.self_collision = False
+        self.length_of_snake = 1
+        self.x1 = (self.cols // 2) * self.snake_block
+        self.y1 = (self.rows // 2) * self.snake_block
+        self.x1_change = 0
+        self.y1_change = 0
+        self.foodx = 0
+        self.foody = 0
+        self.level_version = 0  # Bumped whenever a new board is laid out
+
+    def init_game_variables(self, seed=None):
+        # Every round gets its own seed so it can be replayed
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.game_time = 0.0
+        self.ticks = 0
+        self.current_power_ups = set()
+        self.power_up_timers = {}
+        self.power_ups_collected = Counter()
+        self.snake_speed = self.base_speed
+        self.scheduler.clear()
+        self.power_up_events = {}
+
+        self.game_over = False
+        self.game_close = False
+        self.board_full = False
+        self.death_cause = None
+        self.paused = False
+        self.score = 0
+        self.length_of_snake = 2
+        self.x1 = (self.cols // 2) * self.snake_block
+        self.y1 = (self.rows // 2) * self.snake_block
+        self.x1_change = 0
+        self.y1_change = 0
+        self.obstacles = []  # Initialize obstacles here
+        self.power_ups = []
+        if self.world:
+            self.grid.seed = seed
+        self.grid.clear()
+        self.level_version += 1
+
+        # The snake starts as a single segment in the center of the board
+        self.snake.clear()
+        self.prev_head = None
+        self.prev_tail = None
+        self.self_collision = False
+        head = self.to_cell(self.x1, self.y1)
+        self.snake.push_head(head)
+        self.grid.add_snake(*head)
+
+        self.spawn_initial_objects()
+
+    def spawn_initial_objects(self):
+        if self.world:
+            # Obstacles are generated with each chunk of the world
+            self.obstacles = []
+            self.foodx, self.foody = self.spawn_food()
+        elif self.level is not None:
+            self.obstacles = self.load_level()
+            self.foodx, self.foody = self.spawn_food()
+        else:
+            self.foodx, self.foody = self.spawn_food()
+            self.obstacles = self.generate_obstacles(10)
+        self.spawn_power_up()
+        self.schedule_power_up_spawn()
+
+    def to_cell(self, x, y):
+        return int(x) // self.snake_block, int(y) // self.snake_block
+
+    def to_pixels(self, cx, cy):
+        return cx * self.snake_block, cy * self.snake_block
+
+    def spawn_food(self):
+        """Place food on a random free cell and return its pixel position.
+
+        Raises BoardFullError when there is nowhere left to put it.
+        """
+        cx, cy = self.grid.random_free(self.rng)
+        self.grid.set_kind(cx, cy, FOOD)
+        return self.to_pixels(cx, cy)
+
+    def spawn_power_up(self):
+        if len(self.power_ups) < 3:  # Limit number of power-ups on screen
+            position = self.get_valid_position()
+            if position is None:
+                return
+            self.grid.set_kind(*self.to_cell(*position), POWER_UP)
+            power_up = {
+                'type': self.rng.choice(list(PowerUpType)),
+                'position': position,
+                'spawn_time': self.game_time
+            }
+            # Power-ups left on the board disappear after 10 seconds
+            power_up['despawn_event'] = self.scheduler.schedule(
+                self.game_time + 10, self.despawn_power_up, power_up)
+            self.power_ups.append(power_up)
+
+    def schedule_power_up_spawn(self, mean_interval=5.0):
+        # Spawns arrive as a Poisson process on the game clock (on average
+        # every mean_interval seconds), independent of the frame rate
+        delay = self.rng.expovariate(1.0 / mean_interval)
+        self.scheduler.schedule(self.game_time + delay, self.timed_power_up_spawn)
+
+    def timed_power_up_spawn(self):
+        self.spawn_power_up()
+        self.schedule_power_up_spawn()
+
+    def get_valid_position(self):
+        """A free position in pixels, or None when no free cell can be found."""
+        if self.grid.is_full():
+            return None
+        try:
+            return self.to_pixels(*self.grid.random_free(self.rng))
+        except BoardFullError:
+            return None
+
+    def check_position_conflicts(self, x, y):
+        return not self.grid.is_free(*self.to_cell(x, y))
+
+    def generate_obstacles(self, num_obstacles, max_attempts=100):
+        obstacles = []
+        center_x, center_y = self.cols // 2, self.rows // 2
+        for _ in range(num_obstacles):
+            for _ in range(max_attempts):
+                if self.grid.is_full():
+                    return obstacles
+                cx, cy = self.grid.random_free(self.rng)
+                if abs(cx - center_x) > 3 and abs(cy - center_y) > 3:
+                    self.grid.set_kind(cx, cy, OBSTACLE)
+                    obstacles.append(self.to_pixels(cx, cy))
+                    break
+        return obstacles
+
+    def load_level(self):
+        """Lay out the generated level's walls; restarts hit the level cache."""
+        walls = self.level_cache.get(self.cols, self.rows, self.level)
+        obstacles = []
+        for i in np.flatnonzero(walls).tolist():
+            cx, cy = self.grid.cell(i)
+            self.grid.set_kind(cx, cy, OBSTACLE)
+            obstacles.append(self.to_pixels(cx, cy))
+        return obstacles
+
+    def apply_power_up(self, power_up_type):
+        if power_up_type == PowerUpType.SPEED:
+            self.expire_power_up(PowerUpType.SLOW)
+            self.snake_speed = min(self.base_speed * 1.5, 30)
+            duration = 5
+        elif power_up_type == PowerUpType.SLOW:
+            self.expire_power_up(PowerUpType.SPEED)
+            self.snake_speed = max(self.base_speed * 0.5, 5)
+            duration = 5
+        elif power_up_type == PowerUpType.INVINCIBILITY:
+            self.current_power_ups.add(PowerUpType.INVINCIBILITY)
+            duration = 3
+        elif power_up_type == PowerUpType.DOUBLE_POINTS:
+            self.current_power_ups.add(PowerUpType.DOUBLE_POINTS)
+            duration = 10
+
+        # Picking up the same power-up again restarts its timer
+        self.scheduler.cancel(self.power_up_events.get(power_up_type))
+        self.power_up_timers[power_up_type] = self.game_time + duration
+        self.power_up_events[power_up_type] = self.scheduler.schedule(
+            self.game_time + duration, self.expire_power_up, power_up_type)
+
+    def expire_power_up(self, power_up_type):
+        if power_up_type not in self.power_up_timers:
+            return
+        self.scheduler.cancel(self.power_up_events.pop(power_up_type, None))
+        self.power_up_timers.pop(power_up_type)
+        self.current_power_ups.discard(power_up_type)
+        if power_up_type in (PowerUpType.SPEED, PowerUpType.SLOW):
+            self.snake_speed = self.base_speed
+
+    def remove_power_up(self, power_up):
+        self.power_ups.remove(power_up)
+        self.scheduler.cancel(power_up['despawn_event'])
+        self.grid.set_kind(*self.to_cell(*power_up['position']), EMPTY)
+
+    def despawn_power_up(self, power_up):
+        if power_up in self.power_ups:
+            self.remove_power_up(power_up)
+
+    def update_power_ups(self):
+        # Only events that are due cost anything; the game clock stands
+        # still while the game is paused, so timers pause with it
+        self.scheduler.run_due(self.game_time)
+
+    def update_snake_direction(self, direction):
+        if direction == Direction.UP and self.y1_change <= 0:
+            self.y1_change = -self.snake_block
+            self.x1_change = 0
+        elif direction == Direction.DOWN and self.y1_change >= 0:
+            self.y1_change = self.snake_block
+            self.x1_change = 0
+        elif direction == Direction.LEFT and self.x1_change <= 0:
+            self.x1_change = -self.snake_block
+            self.y1_change = 0
+        elif direction == Direction.RIGHT and self.x1_change >= 0:
+            self.x1_change = self.snake_block
+            self.y1_change = 0
+
+    def update_snake_position(self):
+        # Cells the head and tail left this tick, for interpolated rendering
+        self.prev_head = None
+        self.prev_tail = None
+
+        # The snake waits in place until it is first given a direction
+        if self.x1_change == 0 and self.y1_change == 0:
+            return
+        self.prev_head = self.snake.head
+
+        self.x1 += self.x1_change
+        self.y1 += self.y1_change
+
+        self.x1 = self.x1 % (self.cols * self.snake_block)
+        self.y1 = self.y1 % (self.rows * self.snake_block)
+
+        # Free the tail first so the head may move into the cell it leaves
+        if len(self.snake) >= self.length_of_snake:
+            self.prev_tail = self.snake.pop_tail()
+            self.grid.remove_snake(*self.prev_tail)
+
+        snake_head = self.to_cell(self.x1, self.y1)
+        self.self_collision = snake_head in self.snake
+        self.snake.push_head(snake_head)
+        self.grid.add_snake(*snake_head)
+
+    def check_collisions(self):
+        cx, cy = self.to_cell(self.x1, self.y1)
+        kind = self.grid.kind(cx, cy)
+
+        # Check for collision with food
+        if kind == FOOD:
+            self.grid.set_kind(cx, cy, EMPTY)
+            self.length_of_snake += 1
+            self.score += 10
+            try:
+                self.foodx, self.foody = self.spawn_food()
+            except BoardFullError:
+                # Nothing left to eat: the snake has filled the board
+                self.board_full = True
+                self.game_close = True
+                self.death_cause = 'board_full'
+                return
+            self.spawn_power_up()  # Chance to spawn a power-up after eating food
+
+        # Check for collision with obstacles
+        elif kind == OBSTACLE:
+            self.game_close = True
+            self.death_cause = 'obstacle'
+
+        # Check for collision with power-ups
+        elif kind == POWER_UP:
+            position = self.to_pixels(cx, cy)
+            for power_up in self.power_ups:
+                if power_up['position'] == position:
+                    self.apply_power_up(power_up['type'])
+                    self.power_ups_collected[power_up['type']] += 1
+                    self.remove_power_up(power_up)
+                    break
+
+        # Check for collision with the snake's own body
+        if self.self_collision and PowerUpType.INVINCIBILITY not in self.current_power_ups:
+            self.game_close = True
+            self.death_cause = self.death_cause or 'self'
+
+    def step(self, direction=None):
+        """Advance the game by one tick, optionally steering first."""
+        if direction is not None:
+            self.update_snake_direction(direction)
+        self.ticks += 1
+        self.game_time += 1.0 / self.snake_speed
+        self.update_snake_position()
+        self.check_collisions()
+        self.update_power_ups()
+        return not self.game_close
+
+
+# Direction codes used by BatchSnakeEngine actions; 0 means "no input".
+NO_INPUT = 0
+DIRECTION_VECTORS = np.array([
+    [0, 0],   # no input
+    [0, -1],  # UP
+    [0, 1],   # DOWN
+    [-1, 0],  # LEFT
+    [1, 0],   # RIGHT
+    [0, 0],   # NEUTRAL
+], dtype=np.int32)
+
+
+class BatchSnakeEngine:
+    """Steps many independent games in lockstep on a cell grid.
+
+    Every game lives on a ``cols`` x ``rows`` wrap-around grid and follows the
+    same rules as SnakeEngine (food, growth, obstacles, self-collision, no
+    reversing, waiting in place until the first input), with positions
+    expressed in cells instead of pixels. Power-ups are not modelled.
+    """
+
+    def __init__(self, num_games, cols, rows, num_obstacles=10, initial_length=2, seed=None):
+        self.num_games = num_games
+        self.cols = cols
+        self.rows = rows
+        self.num_obstacles = num_obstacles
+        self.initial_length = initial_length
+        self.capacity = cols * rows + 1
+        self.rng = np.random.default_rng(seed)
+
+        n = num_games
+        self.head = np.zeros((n, 2), dtype=np.int32)
+        self.velocity = np.zeros((n, 2), dtype=np.int32)
+        self.food = np.zeros((n, 2), dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.alive = np.zeros(n, dtype=bool)
+
+        # Ring buffer of body cells plus a per-cell segment count.
+        self.body = np.zeros((n, self.capacity, 2), dtype=np.int32)
+        self.body_start = np.zeros(n, dtype=np.int64)
+        self.body_count = np.zeros(n, dtype=np.int64)
+        self.occupancy = np.zeros((n, rows, cols), dtype=np.int32)
+        self.obstacles = np.zeros((n, rows, cols), dtype=bool)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.num_games, dtype=bool)
+        games = np.flatnonzero(mask)
+        if len(games) == 0:
+            return
+
+        self.head[games] = (self.cols // 2, self.rows // 2)
+        self.velocity[games] = 0
+        self.length[games] = self.initial_length
+        self.score[games] = 0
+        self.ticks[games] = 0
+        self.alive[games] = True
+        # The snake starts as a single segment in the center
+        self.body[games, 0] = (self.cols // 2, self.rows // 2)
+        self.body_start[games] = 0
+        self.body_count[games] = 1
+        self.occupancy[games] = 0
+        self.occupancy[games, self.rows // 2, self.cols // 2] = 1
+        self.obstacles[games] = self._generate_obstacles(len(games))
+        self._spawn_food(games)
+
+    def _generate_obstacles(self, count):
+        # Same rule as SnakeEngine.generate_obstacles: keep clear of the
+        # center both horizontally and vertically.
+        xs = np.flatnonzero(np.abs(np.arange(self.cols) - self.cols // 2) > 3)
+        ys = np.flatnonzero(np.abs(np.arange(self.rows) - self.rows // 2) > 3)
+        grids = np.zeros((count, self.rows, self.cols), dtype=bool)
+        if len(xs) == 0 or len(ys) == 0 or self.num_obstacles == 0:
+            return grids
+        ox = self.rng.choice(xs, size=(count, self.num_obstacles))
+        oy = self.rng.choice(ys, size=(count, self.num_obstacles))
+        games = np.repeat(np.arange(count), self.num_obstacles)
+        grids[games, oy.ravel(), ox.ravel()] = True
+        return grids
+
+    def _free_mask(self, games):
+        free = ~self.obstacles[games] & (self.occupancy[games] == 0)
+        free[np.arange(len(games)), self.head[games, 1], self.head[games, 0]] = False
+        return free
+
+    def _spawn_food(self, games, attempts=8):
+        if len(games) == 0:
+            return
+        # Try a few random cells per game at once, then fall back to an
+        # exact scan for the (rare) games whose candidates were all taken.
+        cx = self.rng.integers(0, self.cols, size=(len(games), attempts))
+        cy = self.rng.integers(0, self.rows, size=(len(games), attempts))
+        free = self._free_mask(games)
+        ok = free[np.arange(len(games))[:, None], cy, cx]
+        found = ok.any(axis=1)
+        first = ok.argmax(axis=1)
+        picked = np.arange(len(games))[found]
+        self.food[games[found], 0] = cx[picked, first[found]]
+        self.food[games[found], 1] = cy[picked, first[found]]
+
+        for i in np.flatnonzero(~found):
+            cells = np.flatnonzero(free[i])
+            game = games[i]
+            if len(cells) == 0:
+                # Board is full; nothing left to eat.
+                self.alive[game] = False
+                continue
+            cell = self.rng.choice(cells)
+            self.food[game] = (cell % self.cols, cell // self.cols)
+
+    def step(self, actions=None):
+        """Advance every live game one tick.
+
+        ``actions`` holds one Direction value per game (0 for no input).
+        Returns the boolean ``alive`` array.
+        """
+        live = np.flatnonzero(self.alive)
+        if len(live) == 0:
+            return self.alive
+
+        if actions is not None:
+            actions = np.asarray(actions)[live]
+            wanted = DIRECTION_VECTORS[actions]
+            # Mirror update_snake_direction: never reverse onto the neck.
+            turning = (wanted != 0).any(axis=1) & ((wanted * self.velocity[live]).sum(axis=1) >= 0)
+            self.velocity[live[turning]] = wanted[turning]
+
+        # Move and wrap around the edges.
+        head = (self.head[live] + self.velocity[live]) % (self.cols, self.rows)
+        self.head[live] = head
+        self.ticks[live] += 1
+
+        # Snakes that have not been given a direction yet wait in place.
+        moving = (self.velocity[live] != 0).any(axis=1)
+        movers, moved_head = live[moving], head[moving]
+
+        # Push the new head into the ring buffer.
+        slot = (self.body_start[movers] + self.body_count[movers]) % self.capacity
+        self.body[movers, slot] = moved_head
+        np.add.at(self.occupancy, (movers, moved_head[:, 1], moved_head[:, 0]), 1)
+        self.body_count[movers] += 1
+
+        # Drop the tail where the snake is longer than its length.
+        trim = movers[self.body_count[movers] > self.length[movers]]
+        if len(trim):
+            tail = self.body[trim, self.body_start[trim] % self.capacity]
+            np.add.at(self.occupancy, (trim, tail[:, 1], tail[:, 0]), -1)
+            self.body_start[trim] = (self.body_start[trim] + 1) % self.capacity
+            self.body_count[trim] -= 1
+
+        # Self-collision: the head shares its cell with another segment.
+        bitten = movers[self.occupancy[movers, moved_head[:, 1], moved_head[:, 0]] > 1]
+        self.alive[bitten] = False
+
+        # Food
+        eaten = live[(head == self.food[live]).all(axis=1)]
+        if len(eaten):
+            self.length[eaten] += 1
+            self.score[eaten] += 10
+            self._spawn_food(eaten)
+
+        # Obstacles
+        crashed = live[self.obstacles[live, head[:, 1], head[:, 0]]]
+        self.alive[crashed] = False
+
+        return self.alive
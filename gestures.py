@@ -0,0 +1,215 @@
+from engine import Direction
+
+# MediaPipe hand landmark indices used for steering
+WRIST = 0
+INDEX_FINGER_MCP = 5
+INDEX_FINGER_TIP = 8
+
+
+class GestureSample:
+    """One detected hand, as it moves through the filter chain."""
+
+    __slots__ = ('dx', 'dy', 'score', 'timestamp', 'direction')
+
+    def __init__(self, dx, dy, score=1.0, timestamp=0.0, direction=None):
+        self.dx = dx
+        self.dy = dy
+        self.score = score
+        self.timestamp = timestamp
+        self.direction = direction
+
+
+def sample_from_landmarks(hand_landmarks, score=1.0, timestamp=0.0):
+    """Build a sample from the index finger's MCP -> tip vector."""
+    tip = hand_landmarks.landmark[INDEX_FINGER_TIP]
+    mcp = hand_landmarks.landmark[INDEX_FINGER_MCP]
+    return GestureSample(tip.x - mcp.x, tip.y - mcp.y, score, timestamp)
+
+
+def classify_vector(dx, dy, threshold):
+    if abs(dy) > abs(dx):
+        if dy < -threshold:
+            return Direction.UP
+        elif dy > threshold:
+            return Direction.DOWN
+    else:
+        if dx < -threshold:
+            return Direction.LEFT
+        elif dx > threshold:
+            return Direction.RIGHT
+    return Direction.NEUTRAL
+
+
+def component_along(direction, dx, dy):
+    if direction == Direction.UP:
+        return -dy
+    elif direction == Direction.DOWN:
+        return dy
+    elif direction == Direction.LEFT:
+        return -dx
+    elif direction == Direction.RIGHT:
+        return dx
+    return 0.0
+
+
+class EMAFilter:
+    """Exponential moving average of the fingertip vector."""
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.dx = None
+        self.dy = None
+
+    def reset(self):
+        self.dx = self.dy = None
+
+    def process(self, sample):
+        if self.dx is None:
+            self.dx, self.dy = sample.dx, sample.dy
+        else:
+            self.dx += self.alpha * (sample.dx - self.dx)
+            self.dy += self.alpha * (sample.dy - self.dy)
+        sample.dx, sample.dy = self.dx, self.dy
+        return sample
+
+
+class ThresholdClassifier:
+    """Fixed-threshold classification, as the game originally steered."""
+
+    def __init__(self, threshold=0.1):
+        self.threshold = threshold
+
+    def reset(self):
+        pass
+
+    def process(self, sample):
+        sample.direction = classify_vector(sample.dx, sample.dy, self.threshold)
+        return sample
+
+
+class HysteresisClassifier:
+    """Classification that needs ``enter`` to switch but only ``exit`` to hold.
+
+    A new direction is taken when the vector clears the ``enter`` threshold.
+    The current direction is kept while its component stays above ``exit``
+    and no other direction clears ``enter``, so noise around a single
+    threshold cannot make the output flicker.
+    """
+
+    def __init__(self, enter=0.12, exit=0.06):
+        self.enter = enter
+        self.exit = exit
+        self.current = None
+
+    def reset(self):
+        self.current = None
+
+    def process(self, sample):
+        candidate = classify_vector(sample.dx, sample.dy, self.enter)
+        holding = (self.current not in (None, Direction.NEUTRAL)
+                   and candidate in (Direction.NEUTRAL, self.current)
+                   and component_along(self.current, sample.dx, sample.dy) > self.exit)
+        if not holding:
+            self.current = candidate
+        sample.direction = self.current
+        return sample
+
+
+class MajorityVoteFilter:
+    """Most common direction over the last ``size`` samples.
+
+    Directions live in a ring buffer with running counts, so each update is
+    O(1). Ties keep the previous output.
+    """
+
+    def __init__(self, size=5):
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.ring = [None] * self.size
+        self.position = 0
+        self.weights = {}
+        self.output = None
+
+    def _push(self, direction, weight):
+        old = self.ring[self.position]
+        if old is not None:
+            old_direction, old_weight = old
+            self.weights[old_direction] -= old_weight
+        self.ring[self.position] = (direction, weight)
+        self.position = (self.position + 1) % self.size
+        self.weights[direction] = self.weights.get(direction, 0.0) + weight
+
+        best = self.output
+        best_weight = self.weights.get(best, 0.0) if best is not None else -1.0
+        for candidate, candidate_weight in self.weights.items():
+            if candidate_weight > best_weight:
+                best, best_weight = candidate, candidate_weight
+        self.output = best
+        return best
+
+    def vote(self, direction):
+        return self._push(direction, 1.0)
+
+    def process(self, sample):
+        sample.direction = self.vote(sample.direction)
+        return sample
+
+
+class WeightedVoteFilter(MajorityVoteFilter):
+    """Majority vote where each sample counts by its handedness score."""
+
+    def process(self, sample):
+        sample.direction = self._push(sample.direction, sample.score)
+        return sample
+
+
+class GestureFilterChain:
+    """Runs a sample through each filter in order and returns its direction."""
+
+    def __init__(self, filters):
+        self.filters = list(filters)
+
+    def reset(self):
+        for gesture_filter in self.filters:
+            gesture_filter.reset()
+
+    def process(self, sample):
+        for gesture_filter in self.filters:
+            sample = gesture_filter.process(sample)
+        return sample.direction
+
+    def run(self, samples):
+        """Filter a recorded sequence offline, yielding one direction per sample."""
+        for sample in samples:
+            yield self.process(sample)
+
+
+FILTERS = {
+    'ema': EMAFilter,
+    'threshold': ThresholdClassifier,
+    'hysteresis': HysteresisClassifier,
+    'majority_vote': MajorityVoteFilter,
+    'weighted_vote': WeightedVoteFilter,
+}
+
+DEFAULT_GESTURE_FILTERS = [
+    {'type': 'ema', 'alpha': 0.5},
+    {'type': 'hysteresis', 'enter': 0.12, 'exit': 0.06},
+    {'type': 'weighted_vote', 'size': 5},
+]
+
+
+def build_filter_chain(config=None):
+    """Build a chain from a list of ``{'type': name, **options}`` dicts."""
+    if config is None:
+        config = DEFAULT_GESTURE_FILTERS
+    filters = []
+    for entry in config:
+        options = dict(entry)
+        kind = options.pop('type')
+        if kind not in FILTERS:
+            raise ValueError(f"Unknown gesture filter {kind!r}; expected one of {sorted(FILTERS)}")
+        filters.append(FILTERS[kind](**options))
+    return GestureFilterChain(filters)
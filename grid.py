@@ -0,0 +1,96 @@
+from array import array
+
+# Cell contents other than the snake, which is tracked separately as a count
+EMPTY = 0
+OBSTACLE = 1
+FOOD = 2
+POWER_UP = 3
+
+
+class BoardFullError(Exception):
+    """Raised when a spawn is requested but no free cell is left."""
+
+
+class OccupancyGrid:
+    """Cell-occupancy bitmap with an O(1) free-cell set.
+
+    Each cell stores what sits on it (EMPTY, OBSTACLE, FOOD or POWER_UP) and
+    how many snake segments cover it. Free cells are kept in a dense list with
+    a reverse index, so adding, removing and picking a random free cell are
+    all constant time.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.size = cols * rows
+        self.clear()
+
+    def clear(self):
+        self.kinds = bytearray(self.size)
+        self.snake = array('I', bytes(4 * self.size))
+        self._free = list(range(self.size))
+        self._free_pos = list(range(self.size))
+
+    def index(self, cx, cy):
+        return cy * self.cols + cx
+
+    def cell(self, index):
+        return index % self.cols, index // self.cols
+
+    def _mark_taken(self, i):
+        pos = self._free_pos[i]
+        if pos < 0:
+            return
+        last = self._free.pop()
+        if last != i:
+            self._free[pos] = last
+            self._free_pos[last] = pos
+        self._free_pos[i] = -1
+
+    def _mark_free(self, i):
+        if self._free_pos[i] >= 0:
+            return
+        self._free_pos[i] = len(self._free)
+        self._free.append(i)
+
+    def kind(self, cx, cy):
+        return self.kinds[cy * self.cols + cx]
+
+    def has_snake(self, cx, cy):
+        return self.snake[cy * self.cols + cx] > 0
+
+    def is_free(self, cx, cy):
+        return self._free_pos[cy * self.cols + cx] >= 0
+
+    def set_kind(self, cx, cy, kind):
+        i = cy * self.cols + cx
+        self.kinds[i] = kind
+        if kind == EMPTY and self.snake[i] == 0:
+            self._mark_free(i)
+        else:
+            self._mark_taken(i)
+
+    def add_snake(self, cx, cy):
+        i = cy * self.cols + cx
+        self.snake[i] += 1
+        self._mark_taken(i)
+
+    def remove_snake(self, cx, cy):
+        i = cy * self.cols + cx
+        self.snake[i] -= 1
+        if self.snake[i] == 0 and self.kinds[i] == EMPTY:
+            self._mark_free(i)
+
+    @property
+    def free_count(self):
+        return len(self._free)
+
+    def is_full(self):
+        return not self._free
+
+    def random_free(self, rng):
+        """Return a random free (cx, cy), or raise BoardFullError."""
+        if not self._free:
+            raise BoardFullError("no free cells left on the board")
+        return self.cell(self._free[rng.randrange(len(self._free))])
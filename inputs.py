@@ -0,0 +1,225 @@
+import threading
+import time
+
+import numpy as np
+import pygame
+
+from autopilot import Autopilot
+from capture import FrameRing, GesturePipeline
+from engine import Direction
+
+ARROW_KEYS = {
+    pygame.K_UP: Direction.UP,
+    pygame.K_DOWN: Direction.DOWN,
+    pygame.K_LEFT: Direction.LEFT,
+    pygame.K_RIGHT: Direction.RIGHT,
+}
+
+
+class InputBackend:
+    """Source of steering input for the game loop.
+
+    ``warm_up`` is called before the start screen and may begin slow set-up
+    in the background; ``start`` is called once the round begins. Every frame
+    ``poll`` returns a new Direction or None, and ``before_step`` is asked
+    again right before each simulation step. ``draw`` may add an overlay to
+    the HUD and returns the rects it covered.
+    """
+
+    name = None
+
+    def warm_up(self):
+        pass
+
+    def start(self):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        return None
+
+    def before_step(self):
+        return None
+
+    def draw(self, display):
+        return []
+
+    def stop(self):
+        pass
+
+
+class KeyboardInput(InputBackend):
+    """Arrow keys; the newest key press since the last poll wins."""
+
+    name = 'keyboard'
+
+    def __init__(self, game):
+        self.pending = None
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key in ARROW_KEYS:
+            self.pending = ARROW_KEYS[event.key]
+
+    def poll(self):
+        direction, self.pending = self.pending, None
+        return direction
+
+
+class CameraPreview:
+    """Picture-in-picture view of what the hand tracker sees.
+
+    The inference thread draws the mirrored camera image, the landmarks and
+    the tracker's region of interest straight into one of three preallocated
+    RGB frames. Each frame is wrapped once in a Surface by
+    ``pygame.image.frombuffer``, which shares its memory, so showing the
+    newest frame is a single blit with no conversion or copy in between.
+    """
+
+    def __init__(self, width=240, height=180):
+        self.size = (width, height)
+        self.ring = FrameRing([np.zeros((height, width, 3), dtype=np.uint8) for _ in range(3)])
+        self.surfaces = [pygame.image.frombuffer(frame, self.size, 'RGB')
+                         for frame in self.ring.frames]
+        self.shown = None
+
+    def draw(self, display, margin=10):
+        index = self.ring.poll()
+        if index is not None:
+            self.shown = index
+        if self.shown is None:
+            return []
+        width, height = display.get_size()
+        position = (width - self.size[0] - margin, height - self.size[1] - margin)
+        return [display.blit(self.surfaces[self.shown], position)]
+
+
+class GestureInput(InputBackend):
+    """Hand gestures from the camera, via the threaded GesturePipeline.
+
+    OpenCV and MediaPipe are only imported here, on a background thread
+    started by ``warm_up``, which also opens the camera and lets the
+    inference thread load the hand model while the start screen animates.
+    Without a camera (or the packages) the game falls back to the keyboard.
+
+    F2 toggles a CameraPreview in the bottom-right corner; frames are only
+    drawn for it while it is on.
+    """
+
+    name = 'gesture'
+
+    def __init__(self, game):
+        self.game = game
+        self.thread = None
+        self.pipeline = None
+        self.error = None
+        self.warm_up_seconds = None
+        self.preview = None
+        self.show_preview = game.show_camera_preview
+
+    def warm_up(self):
+        self.thread = threading.Thread(target=self._warm_up, name="gesture-warm-up", daemon=True)
+        self.thread.start()
+
+    def _warm_up(self):
+        start = time.perf_counter()
+        try:
+            import cv2
+            import mediapipe as mp
+            from tracking import AdaptiveHandTracker
+        except ImportError as e:
+            self.error = f"Gesture input unavailable ({e})"
+            return
+
+        cap = cv2.VideoCapture(0)
+        if not cap.isOpened():
+            cap.release()
+            self.error = "No camera found"
+            return
+
+        game = self.game
+        self.pipeline = GesturePipeline(
+            cap,
+            lambda: AdaptiveHandTracker(
+                mp.solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7),
+                **game.tracker_options),
+            game.process_hand_results,
+            game.profiler)
+        self.pipeline.start()
+        self.warm_up_seconds = time.perf_counter() - start
+
+    def start(self):
+        if self.thread is None:
+            self.warm_up()
+        self.thread.join()
+        if self.error:
+            print(f"{self.error}; steer with the arrow keys instead")
+        elif self.pipeline is not None:
+            print(f"Camera ready after {self.warm_up_seconds * 1000:.0f} ms")
+            # Drop whatever was seen during the start screen
+            self.pipeline.poll_direction()
+            self.set_preview(self.show_preview)
+
+    def set_preview(self, show):
+        self.show_preview = show
+        if show and self.preview is None:
+            self.preview = CameraPreview()
+        if self.pipeline is not None:
+            self.pipeline.preview = self.preview.ring if show else None
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+            self.set_preview(not self.show_preview)
+
+    def poll(self):
+        if self.pipeline is None:
+            return None
+        direction = self.pipeline.poll_direction()
+        # A relaxed hand must not replace a turn still waiting for its step
+        if direction == Direction.NEUTRAL:
+            return None
+        return direction
+
+    def draw(self, display):
+        if not self.show_preview or self.pipeline is None:
+            return []
+        return self.preview.draw(display)
+
+    def stop(self):
+        if self.thread is not None:
+            # Quitting from the start screen: let warm-up finish so its camera is released
+            self.thread.join()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            print(self.pipeline.format_report())
+            self.pipeline = None
+
+
+class AutopilotInput(InputBackend):
+    """Demo mode: the pathfinding Autopilot decides every step."""
+
+    name = 'autopilot'
+
+    def __init__(self, game):
+        self.autopilot = Autopilot(game)
+
+    def before_step(self):
+        return self.autopilot.decide()
+
+
+INPUTS = {
+    'keyboard': KeyboardInput,
+    'gesture': GestureInput,
+    'autopilot': AutopilotInput,
+}
+
+
+def build_inputs(game, name):
+    """Backends for input mode ``name``; the keyboard is always available and comes first."""
+    if name not in INPUTS:
+        raise ValueError(f"Unknown input {name!r}; expected one of {sorted(INPUTS)}")
+    inputs = [KeyboardInput(game)]
+    if name != 'keyboard':
+        inputs.append(INPUTS[name](game))
+    return inputs
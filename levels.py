@@ -0,0 +1,199 @@
+import argparse
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Parameters of a generated level. 'seed' picks the layout, 'density' is the
+# fraction of blocks that become walls, walls come in corridor_width x
+# corridor_width blocks (so every gap is at least that wide), and nothing
+# is placed within 'clearance' cells of the centre row or column.
+DEFAULT_LEVEL = {
+    'seed': 0,
+    'density': 0.2,
+    'corridor_width': 2,
+    'clearance': 3,
+}
+
+
+def level_params(**overrides):
+    """DEFAULT_LEVEL with ``overrides`` applied, checked for sane values."""
+    params = dict(DEFAULT_LEVEL)
+    for name, value in overrides.items():
+        if name not in params:
+            raise ValueError(f"Unknown level parameter {name!r}; expected one of {sorted(params)}")
+        if value is not None:
+            params[name] = value
+    if params['seed'] < 0:
+        raise ValueError("seed must not be negative")
+    if not 0.0 <= params['density'] < 1.0:
+        raise ValueError("density must be in [0, 1)")
+    # Replay headers store the corridor width in one byte
+    if not 1 <= params['corridor_width'] <= 255:
+        raise ValueError("corridor_width must be in [1, 255]")
+    if params['clearance'] < 0:
+        raise ValueError("clearance must not be negative")
+    return params
+
+
+def add_level_arguments(parser):
+    group = parser.add_argument_group("generated level (default: 10 scattered obstacles)")
+    group.add_argument("--level", type=int, metavar="SEED", help="play generated level SEED")
+    group.add_argument("--density", type=float, help="fraction of wall blocks")
+    group.add_argument("--corridor-width", type=int, help="minimum gap between walls, in cells")
+    group.add_argument("--clearance", type=int, help="cells kept clear around the centre")
+
+
+def level_from_args(args, parser=None):
+    """Level parameters from add_level_arguments options, or None when none were given.
+
+    Invalid values are reported with ``parser.error`` when a parser is given.
+    """
+    options = {'seed': args.level, 'density': args.density,
+               'corridor_width': args.corridor_width, 'clearance': args.clearance}
+    if all(value is None for value in options.values()):
+        return None
+    try:
+        return level_params(**options)
+    except ValueError as e:
+        if parser is None:
+            raise
+        parser.error(str(e))
+
+
+def reachable(free, start):
+    """Flood fill over the wrap-around grid: cells of ``free`` reachable from ``start``.
+
+    Each iteration grows the filled region by one cell in every direction at
+    once, so the loop runs once per cell of path length, not once per cell.
+    """
+    filled = np.zeros_like(free)
+    filled[start] = free[start]
+    while True:
+        grown = (filled
+                 | np.roll(filled, 1, axis=0) | np.roll(filled, -1, axis=0)
+                 | np.roll(filled, 1, axis=1) | np.roll(filled, -1, axis=1)) & free
+        if np.array_equal(grown, filled):
+            return filled
+        filled = grown
+
+
+def generate_level(cols, rows, params):
+    """Return a (rows, cols) bool array of obstacle cells.
+
+    Walls are drawn as random blocks at corridor resolution, the centre
+    cross is cleared for the snake's start, and any free pocket the flood
+    fill cannot reach from the centre is filled in. Every free cell of the
+    result is therefore reachable from the start.
+    """
+    width = params['corridor_width']
+    rng = np.random.default_rng([params['seed'], cols, rows])
+    blocks = rng.random((-(-rows // width), -(-cols // width))) < params['density']
+    walls = np.repeat(np.repeat(blocks, width, axis=0), width, axis=1)[:rows, :cols]
+
+    center_x, center_y = cols // 2, rows // 2
+    clearance = params['clearance']
+    walls[max(center_y - clearance, 0):center_y + clearance + 1, :] = False
+    walls[:, max(center_x - clearance, 0):center_x + clearance + 1] = False
+
+    return ~reachable(~walls, (center_y, center_x))
+
+
+class LevelCache:
+    """Generated levels, kept in memory and as bit-packed files on disk.
+
+    Levels are keyed by (cols, rows, params); a file holds nothing but the
+    packed obstacle bits, so a 4K board is a few hundred bytes. Missing or
+    damaged files are simply regenerated.
+    """
+
+    def __init__(self, directory="levels", max_levels=32):
+        self.directory = directory
+        self.max_levels = max_levels
+        self.levels = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+        self.generated = 0
+
+    def key(self, cols, rows, params):
+        return (cols, rows) + tuple(sorted(params.items()))
+
+    def path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{key[0]}x{key[1]}-{digest}.lvl")
+
+    def get(self, cols, rows, params):
+        key = self.key(cols, rows, params)
+        walls = self.levels.get(key)
+        if walls is not None:
+            self.hits += 1
+            self.levels.move_to_end(key)
+            return walls
+
+        walls = self.load(key, cols, rows)
+        if walls is None:
+            walls = generate_level(cols, rows, params)
+            self.generated += 1
+            self.save(key, walls)
+        else:
+            self.loads += 1
+
+        self.levels[key] = walls
+        if len(self.levels) > self.max_levels:
+            self.levels.popitem(last=False)
+        return walls
+
+    def load(self, key, cols, rows):
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != -(-cols * rows // 8):
+            return None
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=cols * rows)
+        return bits.astype(bool).reshape(rows, cols)
+
+    def save(self, key, walls):
+        path = self.path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so a concurrent reader never sees half a file
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(np.packbits(walls.ravel()).tobytes())
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"Could not cache level: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate levels into the on-disk cache.")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--seeds", type=int, default=10,
+                        help="how many level seeds to generate, starting at --level")
+    add_level_arguments(parser)
+    args = parser.parse_args()
+    level_from_args(args, parser)
+
+    from engine import SnakeEngine
+
+    engine = SnakeEngine(args.width, args.height)
+    cache = LevelCache()
+    first = args.level or 0
+    for seed in range(first, first + args.seeds):
+        params = level_params(seed=seed, density=args.density,
+                              corridor_width=args.corridor_width, clearance=args.clearance)
+        start = time.perf_counter()
+        walls = cache.get(engine.cols, engine.rows, params)
+        elapsed = time.perf_counter() - start
+        print(f"seed {seed}: {engine.cols}x{engine.rows} cells, {walls.mean():.1%} walls, "
+              f"{elapsed * 1000:.1f} ms")
+    print(f"generated={cache.generated} loaded={cache.loads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,29 @@
+import time
+
+# Taken before the other imports so time-to-first-frame includes them
+STARTED_AT = time.perf_counter()
+
 import pygame
 import random
-import cv2
-import mediapipe as mp
-from enum import Enum
 import numpy as np
-import time
 import sys
-
-class Direction(Enum):
-    UP = 1
-    DOWN = 2
-    LEFT = 3
-    RIGHT = 4
-    NEUTRAL = 5
-
-class PowerUpType(Enum):
-    SPEED = 1
-    SLOW = 2
-    INVINCIBILITY = 3
-    DOUBLE_POINTS = 4
-
-class GameState:
-    def __init__(self):
+import os
+import argparse
+
+from engine import PowerUpType, SnakeEngine
+from gestures import DEFAULT_GESTURE_FILTERS, build_filter_chain, sample_from_landmarks
+from inputs import INPUTS, build_inputs
+from levels import add_level_arguments, level_from_args
+from profiler import FrameProfiler
+from renderer import DirtyRectRenderer, WorldRenderer
+from replay import ReplayRecorder
+from spectator import SpectatorServer
+from telemetry import SessionTelemetry, TelemetryStore
+from text import TextRenderer
+from traces import TraceWriter
+
+class GameState(SnakeEngine):
+    def __init__(self, width=None, height=None, seed=None, world_size=None):
         # Initialize pygame
         # Initialize Pygame
         pygame.init()
@@ -31,10 +33,13 @@ class GameState:
         
         pygame.display.set_caption("Snake & Apple AI Game")
         
-        # Get the screen dimensions
+        # Get the screen dimensions unless a size was requested
         self.screen_info = pygame.display.Info()
-        self.width = self.screen_info.current_w
-        self.height = self.screen_info.current_h
+        width = width or self.screen_info.current_w
+        height = height or self.screen_info.current_h
+
+        # Game rules and state live in the headless engine
+        SnakeEngine.__init__(self, width, height, seed=seed, world_size=world_size)
         
         # Display setup
         self.display = pygame.display.set_mode((self.width, self.height))
@@ -51,66 +56,70 @@ class GameState:
             'PURPLE': (128, 0, 128)
         }
         
-        # Game settings
-        self.snake_block = max(25, self.width // 80)
-        self.food_size = max(25, self.width // 100)
-        self.base_speed = 20
-        self.snake_speed = self.base_speed
-        
-        # Fonts
-        self.font_style = pygame.font.SysFont("bahnschrift", 25)
-        self.score_font = pygame.font.SysFont("bahnschrift", 35)
+        # Fonts and rendered text are cached and shared by every screen
+        self.text = TextRenderer()
         
-        # MediaPipe setup
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        
-        # Game state
+        # Display and input state
         self.clock = pygame.time.Clock()
         self.is_fullscreen = False
-        self.power_ups = []
-        self.current_power_ups = set()
-        self.power_up_timers = {}
-        self.gesture_smoothing_buffer = []
-        self.buffer_size = 5
-        self.obstacles = []  # Initialize the obstacles list
-        # Initialize game variables
-        self.game_over = False
-        self.game_close = False
-        self.paused = False
-        self.score = 0
-        self.snake_list = []
-        self.length_of_snake = 1
-        self.x1 = self.width / 2
-        self.y1 = self.height / 2
-        self.x1_change = 0
-        self.y1_change = 0
-
-    def init_game_variables(self):
-        self.game_over = False
-        self.game_close = False
-        self.paused = False
-        self.score = 0
-        self.snake_list = []
-        self.length_of_snake = 2
-        self.x1 = self.width / 2
-        self.y1 = self.height / 2
-        self.x1_change = 0
-        self.y1_change = 0
-        self.obstacles = []  # Initialize obstacles here
-        self.spawn_initial_objects()
-
-    def spawn_initial_objects(self):
-        self.foodx, self.foody = self.spawn_food()
-        self.obstacles = self.generate_obstacles(10)
-        self.spawn_power_up()
-
-    def spawn_food(self):
-        while True:
-            x = round(random.randrange(0, self.width - self.food_size) / 10.0) * 10.0
-            y = round(random.randrange(0, self.height - self.food_size) / 10.0) * 10.0
-            if not self.check_position_conflicts(x, y):
-                return x, y
+
+        # Filters between landmark detection and steering; see gestures.py
+        self.gesture_filter = build_filter_chain(DEFAULT_GESTURE_FILTERS)
+
+        # Optional landmark trace of every processed camera frame
+        self.trace_writer = None
+
+        # Input backends (see inputs.py): 'keyboard', 'gesture' or
+        # 'autopilot'. The arrow keys work in every mode.
+        self.input_mode = 'gesture'
+        self.inputs = []
+
+        # Picture-in-picture camera view in gesture mode; F2 toggles it
+        self.show_camera_preview = False
+
+        # Startup timing, reported once the first frames are on screen
+        self.first_frame_at = None
+
+        # Hand inference: downscale, crop to the hand and skip stable frames.
+        # Set 'adaptive' to False to process every full frame.
+        self.tracker_options = {
+            'adaptive': True,
+            'inference_width': 320,
+            'latency_budget': 0.1,
+        }
+
+        # Frame pacing: frames are drawn at render_fps while the game advances
+        # snake_speed steps per second. pygame 2.6 cannot report the
+        # monitor's refresh rate, so this is a fixed rate, not vsync
+        self.render_fps = 60
+        self.max_steps_per_frame = 5
+
+        # Rendering: redraw only changed cells over a pre-baked background,
+        # or set dirty_rendering to False to repaint the whole screen
+        self.dirty_rendering = True
+        self.renderer = DirtyRectRenderer(self)
+        if self.world:
+            # A world bigger than the screen scrolls with the head instead
+            self.renderer = WorldRenderer(self)
+
+        # Per-round input log, saved under replays/ when the round ends
+        self.recorder = None
+
+        # Optional SpectatorServer streaming every step to other processes
+        self.spectator = None
+
+        # Optional TelemetryStore keeping every round and the high scores;
+        # it writes on its own thread, the game only queues records
+        self.telemetry = None
+        self.session = None
+        self.last_round = None
+        self.leaderboard_reply = None
+
+        # Frame profiler: F3 toggles the overlay, F4 exports traces
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+        self.overlay_refreshed = 0.0
+        self.overlay_lines = []
 
     def display_start_screen(self):
         # Initialize game background and variables
@@ -128,8 +137,8 @@ class GameState:
         blink_timer = 0
 
         # Load snake and apple images
-        snake_image = pygame.font.SysFont("Arial", 50).render("🐍", True, (0, 255, 0))
-        apple_image = pygame.font.SysFont("Arial", 50).render("🍎", True, (255, 0, 0))
+        snake_image = self.text.render("🐍", 50, (0, 255, 0), name="Arial")
+        apple_image = self.text.render("🍎", 50, (255, 0, 0), name="Arial")
 
         # Multiple flying snake and apple smileys
         num_snakes = 5
@@ -149,8 +158,7 @@ class GameState:
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit_game()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         running = False
@@ -182,31 +190,26 @@ class GameState:
                     apple_speed_y[i] *= -1
 
             # Game Title
-            font = pygame.font.SysFont("bahnschrift", 80, bold=True)
-            game_title_text = font.render("Snake & Apple", True, (255, 255, 255))
+            game_title_text = self.text.render("Snake & Apple", 80, (255, 255, 255), bold=True)
             game_title_text.set_alpha(title_alpha)
             game_title_rect = game_title_text.get_rect(center=(self.width / 2, title_y))
             self.display.blit(game_title_text, game_title_rect)
 
             # Subtitle
-            font = pygame.font.SysFont("bahnschrift", 30, bold=True)
-            sub_text = font.render("(AI Enabled)", True, (255, 255, 0))  # Yellow color
+            sub_text = self.text.render("(AI Enabled)", 30, (255, 255, 0), bold=True)  # Yellow color
             sub_text.set_alpha(subtitle_alpha)
             sub_text_rect = sub_text.get_rect(center=(self.width / 2, subtitle_y))
             self.display.blit(sub_text, sub_text_rect)
 
             # AI sparkle effect
-            sparkle_font = pygame.font.SysFont("bahnschrift", 20, bold=True)
-            sparkle_text = sparkle_font.render("*", True, (255, 255, 0))  # Yellow sparkle
+            sparkle_text = self.text.render("*", 20, (255, 255, 0), bold=True)  # Yellow sparkle
             sparkle_rect = sparkle_text.get_rect(center=(self.width / 2 + 130, subtitle_y - 10))
             self.display.blit(sparkle_text, sparkle_rect)
-            sparkle_text = sparkle_font.render("*", True, (255, 255, 0))
             sparkle_rect = sparkle_text.get_rect(center=(self.width / 2 + 115, subtitle_y))
             self.display.blit(sparkle_text, sparkle_rect)
 
             # Start text animation
-            start_font = pygame.font.SysFont("bahnschrift", 40)
-            start_text = start_font.render("Press SPACE to Start", True, (255, 255, 255))
+            start_text = self.text.render("Press SPACE to Start", 40, (255, 255, 255))
             start_text.set_alpha(start_alpha if blink_visible else 0)  # Blink effect
             start_text_rect = start_text.get_rect(center=(self.width / 2, start_y))
             self.display.blit(start_text, start_text_rect)
@@ -229,100 +232,11 @@ class GameState:
 
             # Update display and set frame rate
             pygame.display.update()
+            if self.first_frame_at is None:
+                self.first_frame_at = time.perf_counter()
+                print(f"Time to first frame: {(self.first_frame_at - STARTED_AT) * 1000:.0f} ms")
             clock.tick(30)
 
-    def spawn_power_up(self):
-        if len(self.power_ups) < 3:  # Limit number of power-ups on screen
-            power_up = {
-                'type': random.choice(list(PowerUpType)),
-                'position': self.get_valid_position(),
-                'spawn_time': time.time()
-            }
-            self.power_ups.append(power_up)
-
-    def get_valid_position(self):
-        while True:
-            x = round(random.randrange(0, self.width - self.food_size) / 10.0) * 10.0
-            y = round(random.randrange(0, self.height - self.food_size) / 10.0) * 10.0
-            if not self.check_position_conflicts(x, y):
-                return (x, y)
-
-    def check_position_conflicts(self, x, y):
-        # Check obstacles
-        for obstacle in self.obstacles:
-            if abs(x - obstacle[0]) < self.snake_block and abs(y - obstacle[1]) < self.snake_block:
-                return True
-        
-        # Check existing power-ups
-        for power_up in self.power_ups:
-            pos = power_up['position']
-            if abs(x - pos[0]) < self.food_size and abs(y - pos[1]) < self.food_size:
-                return True
-
-        # Check snake body
-        for segment in self.snake_list:
-            if abs(x - segment[0]) < self.snake_block and abs(y - segment[1]) < self.snake_block:
-                return True
-
-        return False
-
-    def generate_obstacles(self, num_obstacles):
-        obstacles = []
-        for _ in range(num_obstacles):
-            while True:
-                x = round(random.randrange(0, self.width - self.snake_block) / 10.0) * 10.0
-                y = round(random.randrange(0, self.height - self.snake_block) / 10.0) * 10.0
-                if abs(x - self.width/2) > self.snake_block * 3 and abs(y - self.height/2) > self.snake_block * 3:
-                    obstacles.append((x, y))
-                    break
-        return obstacles
-
-    def get_smoothed_direction(self, new_direction):
-        self.gesture_smoothing_buffer.append(new_direction)
-        if len(self.gesture_smoothing_buffer) > self.buffer_size:
-            self.gesture_smoothing_buffer.pop(0)
-        
-        direction_counts = {}
-        for direction in self.gesture_smoothing_buffer:
-            direction_counts[direction] = direction_counts.get(direction, 0) + 1
-            
-        return max(direction_counts.items(), key=lambda x: x[1])[0]
-
-    def get_hand_direction(self, hand_landmarks):
-        index_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        index_mcp = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_MCP]
-        
-        y_diff = index_tip.y - index_mcp.y
-        x_diff = index_tip.x - index_mcp.x
-        
-        threshold = 0.1
-        if abs(y_diff) > abs(x_diff):
-            if y_diff < -threshold:
-                return Direction.UP
-            elif y_diff > threshold:
-                return Direction.DOWN
-        else:
-            if x_diff < -threshold:
-                return Direction.LEFT
-            elif x_diff > threshold:
-                return Direction.RIGHT
-        
-        return Direction.NEUTRAL
-
-    def apply_power_up(self, power_up_type):
-        if power_up_type == PowerUpType.SPEED:
-            self.snake_speed = min(self.base_speed * 1.5, 30)
-            self.power_up_timers[PowerUpType.SPEED] = time.time() + 5
-        elif power_up_type == PowerUpType.SLOW:
-            self.snake_speed = max(self.base_speed * 0.5, 5)
-            self.power_up_timers[PowerUpType.SLOW] = time.time() + 5
-        elif power_up_type == PowerUpType.INVINCIBILITY:
-            self.current_power_ups.add(PowerUpType.INVINCIBILITY)
-            self.power_up_timers[PowerUpType.INVINCIBILITY] = time.time() + 3
-        elif power_up_type == PowerUpType.DOUBLE_POINTS:
-            self.current_power_ups.add(PowerUpType.DOUBLE_POINTS)
-            self.power_up_timers[PowerUpType.DOUBLE_POINTS] = time.time() + 10
-
     def play_background_music(self):
         try:
             pygame.mixer.init()
@@ -332,26 +246,45 @@ class GameState:
         except pygame.error as e:
             print(f"Error loading music: {e}")  # Handle any errors that occur
 
-    def update_power_ups(self):
-        current_time = time.time()
-        expired_power_ups = []
-        
-        for power_up_type, end_time in self.power_up_timers.items():
-            if current_time > end_time:
-                expired_power_ups.append(power_up_type)
-        
-        for power_up_type in expired_power_ups:
-            self.power_up_timers.pop(power_up_type)
-            self.current_power_ups.discard(power_up_type)
-            if power_up_type in (PowerUpType.SPEED, PowerUpType.SLOW):
-                self.snake_speed = self.base_speed
-        
-        self.power_ups = [p for p in self.power_ups if current_time - p['spawn_time'] < 10]
-        
-        if random.random() < 0.01:
-            self.spawn_power_up()
+    def power_up_color(self, power_up_type):
+        if power_up_type == PowerUpType.SPEED:
+            return self.COLORS['RED']
+        elif power_up_type == PowerUpType.INVINCIBILITY:
+            return self.COLORS['PURPLE']
+        return self.COLORS['YELLOW']
 
-    def draw_game_objects(self):
+    def snake_color(self):
+        if PowerUpType.INVINCIBILITY in self.current_power_ups:
+            return self.COLORS['YELLOW']
+        return self.COLORS['GREEN']
+
+    def motion_rects(self, alpha):
+        """Rects for the head and tail part-way between their last two cells."""
+        if alpha >= 1.0:
+            return []
+        rects = []
+        if self.prev_head is not None:
+            rects.append(self.lerp_rect(self.prev_head, self.snake.head, alpha))
+        if self.prev_tail is not None:
+            rects.append(self.lerp_rect(self.prev_tail, self.snake.tail, alpha))
+        return rects
+
+    def lerp_rect(self, start, end, alpha):
+        # Wrapping across the board edge jumps straight to the new cell
+        if abs(end[0] - start[0]) + abs(end[1] - start[1]) != 1:
+            alpha = 1.0
+        x = start[0] + (end[0] - start[0]) * alpha
+        y = start[1] + (end[1] - start[1]) * alpha
+        return pygame.Rect(round(x * self.snake_block), round(y * self.snake_block),
+                           self.snake_block, self.snake_block)
+
+    def sliding_head(self, alpha):
+        """The head cell while the head is still drawn sliding into it."""
+        if alpha < 1.0 and self.prev_head is not None:
+            return self.snake.head
+        return None
+
+    def draw_game_objects(self, alpha=1.0):
         self.display.fill(self.COLORS['BLUE'])
         
         pygame.draw.rect(self.display, self.COLORS['GREEN'],
@@ -362,135 +295,242 @@ class GameState:
                            [obstacle[0], obstacle[1], self.snake_block, self.snake_block])
         
         for power_up in self.power_ups:
-            color = self.COLORS['YELLOW']
-            if power_up['type'] == PowerUpType.SPEED:
-                color = self.COLORS['RED']
-            elif power_up['type'] == PowerUpType.INVINCIBILITY:
-                color = self.COLORS['PURPLE']
-            pygame.draw.rect(self.display, color,
+            pygame.draw.rect(self.display, self.power_up_color(power_up['type']),
                            [power_up['position'][0], power_up['position'][1],
                             self.food_size, self.food_size])
         
-        snake_color = self.COLORS['GREEN']
-        if PowerUpType.INVINCIBILITY in self.current_power_ups:
-            snake_color = self.COLORS['YELLOW']
-        for x in self.snake_list:
-            pygame.draw.rect(self.display, snake_color,
-                           [x[0], x[1], self.snake_block, self.snake_block])
+        snake_color = self.snake_color()
+        sliding_head = self.sliding_head(alpha)
+        for cx, cy in self.snake:
+            if (cx, cy) != sliding_head:
+                pygame.draw.rect(self.display, snake_color,
+                               [cx * self.snake_block, cy * self.snake_block,
+                                self.snake_block, self.snake_block])
+        for rect in self.motion_rects(alpha):
+            pygame.draw.rect(self.display, snake_color, rect)
 
     def display_game_info(self):
-        score_text = self.score_font.render(f"Score: {self.score}", True, self.COLORS['WHITE'])
-        self.display.blit(score_text, [10, 10])
+        """Draws the HUD and returns the rects it covered."""
+        score_text = self.text.render(f"Score: {self.score}", 35, self.COLORS['WHITE'])
+        rects = [self.display.blit(score_text, [10, 10])]
         
         y_offset = 50
         for power_up_type in self.current_power_ups:
-            time_left = round(self.power_up_timers[power_up_type] - time.time(), 1)
+            time_left = round(self.power_up_timers[power_up_type] - self.game_time, 1)
             if time_left > 0:
-                power_up_text = self.font_style.render(
-                    f"{power_up_type.name}: {time_left}s", True, self.COLORS['WHITE'])
-                self.display.blit(power_up_text, [10, y_offset])
+                power_up_text = self.text.render(
+                    f"{power_up_type.name}: {time_left}s", 25, self.COLORS['WHITE'])
+                rects.append(self.display.blit(power_up_text, [10, y_offset]))
                 y_offset += 30
+        
+        for backend in self.inputs:
+            rects.extend(backend.draw(self.display))
+
+        if self.show_profiler:
+            rects.extend(self.draw_profiler_overlay())
+        return rects
+
+    def render_frame(self, alpha=1.0):
+        """Draws the board ``alpha`` of the way from the previous tick to the current one."""
+        if self.dirty_rendering or self.world:
+            dirty_rects = self.renderer.render(alpha)
+        else:
+            self.draw_game_objects(alpha)
+            self.display_game_info()
+            dirty_rects = None
+        self.profiler.mark('draw')
+        
+        if dirty_rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(dirty_rects)
+        self.profiler.mark('flip')
+
+    def draw_profiler_overlay(self):
+        """Draws stage percentiles in the top-right corner and returns the rects."""
+        now = time.perf_counter()
+        if now - self.overlay_refreshed > 0.5:
+            # Percentiles are re-sorted twice a second, not every frame
+            self.overlay_refreshed = now
+            self.overlay_lines = ["stage       p50    p95    p99 ms"]
+            for stage, values in self.profiler.summary().items():
+                self.overlay_lines.append(f"{stage:<9}" + "".join(f"{v:7.2f}" for v in values))
+        
+        rects = []
+        y_offset = 10
+        for line in self.overlay_lines:
+            line_text = self.text.render(line, 20, self.COLORS['WHITE'], name="consolas")
+            rects.append(self.display.blit(line_text, [self.width - 320, y_offset]))
+            y_offset += 22
+        return rects
 
     def run_game(self):
-        cap = cv2.VideoCapture(0)
+        # Slow input set-up (camera, hand model) overlaps the start screen
+        self.inputs = build_inputs(self, self.input_mode)
+        for backend in self.inputs:
+            backend.warm_up()
         self.play_background_music()
         self.display_start_screen()
         waiting = True
         while waiting:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit_game()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         waiting = False
             self.clock.tick(10)  # Limit frame rate to prevent high CPU usage
-        with self.mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7) as hands:
-            self.init_game_variables()
+        for backend in self.inputs:
+            backend.start()
+        if self.spectator is not None:
+            self.spectator.start()
+        self.init_game_variables()
+        self.recorder = ReplayRecorder(self)
+        self.session = SessionTelemetry(self.input_mode, self.level)
+        
+        # Fixed-timestep loop: the simulation advances in steps of
+        # 1 / snake_speed seconds of accumulated real time, while frames are
+        # drawn at the display rate, interpolating between the last two steps.
+        render_fps = self.render_fps
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        direction = None
+        first_game_frame = True
+        
+        while not self.game_over:
+            if self.game_close:
+                self.save_replay()
+                self.finish_session()
+                self.handle_game_over()
+                self.recorder = ReplayRecorder(self)
+                self.session = SessionTelemetry(self.input_mode, self.level)
+                accumulator = 0.0
+                last_time = time.perf_counter()
+                continue
+            
+            self.profiler.begin_frame()
+            if self.handle_events():
+                break
+            self.profiler.mark('events')
             
-            while not self.game_over:
-                if self.game_close:
-                    self.handle_game_over()
-                    continue
-                
-                if self.handle_events():
+            if self.paused:
+                self.clock.tick(render_fps)
+                last_time = time.perf_counter()
+                continue
+            
+            # Keep the newest input until a step consumes it
+            direction = self.poll_inputs() or direction
+            self.profiler.mark('input')
+            
+            now = time.perf_counter()
+            accumulator += now - last_time
+            last_time = now
+            steps = 0
+            while accumulator >= 1.0 / self.snake_speed and not self.game_close:
+                if steps == self.max_steps_per_frame:
+                    # Too far behind after a stall: drop the backlog
+                    accumulator = 0.0
                     break
-                
-                if self.paused:
-                    continue
-                
-                ret, frame = cap.read()
-                if not ret:
-                    continue
-                
-                frame = cv2.flip(frame, 1)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = hands.process(frame_rgb)
-                
-                if results.multi_hand_landmarks:
-                    for landmarks in results.multi_hand_landmarks:
-                        self.mp_drawing.draw_landmarks(frame, landmarks,
-                                                     self.mp_hands.HAND_CONNECTIONS)
-                        direction = self.get_hand_direction(landmarks)
-                        smoothed_direction = self.get_smoothed_direction(direction)
-                        self.update_snake_direction(smoothed_direction)
-                
-                self.update_snake_position()
-                self.check_collisions()
-                self.update_power_ups()
-                
-                self.draw_game_objects()
-                self.display_game_info()
-                pygame.display.update()
-                
-                self.clock.tick(self.snake_speed)
+                accumulator -= 1.0 / self.snake_speed
+                direction = self.step_input() or direction
+                self.recorder.record(direction)
+                self.step(direction)
+                self.session.step(self)
+                if self.spectator is not None:
+                    self.spectator.publish(self)
+                direction = None
+                steps += 1
+            self.profiler.mark('simulate')
             
-            cap.release()
-            pygame.quit()
-
-    def update_snake_direction(self, direction):
-        if direction == Direction.UP and self.y1_change <= 0:
-            self.y1_change = -self.snake_block
-            self.x1_change = 0
-        elif direction == Direction.DOWN and self.y1_change >= 0:
-            self.y1_change = self.snake_block
-            self.x1_change = 0
-        elif direction == Direction.LEFT and self.x1_change <= 0:
-            self.x1_change = -self.snake_block
-            self.y1_change = 0
-        elif direction == Direction.RIGHT and self.x1_change >= 0:
-            self.x1_change = self.snake_block
-            self.y1_change = 0
-
-    def update_snake_position(self):
-        self.x1 += self.x1_change
-        self.y1 += self.y1_change
-        
-        self.x1 = self.x1 % self.width
-        self.y1 = self.y1 % self.height
+            self.render_frame(min(accumulator * self.snake_speed, 1.0))
+            if first_game_frame:
+                first_game_frame = False
+                print(f"First game frame after {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms")
+            
+            self.session.frame(self.clock.tick(render_fps))
+            self.profiler.mark('tick')
+            self.profiler.end_frame()
         
-        snake_head = [self.x1, self.y1]
-        self.snake_list.append(snake_head)
-        if len(self.snake_list) > self.length_of_snake:
-            del self.snake_list[0]
-    def check_collisions(self):
-        # Check for collision with food
-        if abs(self.x1 - self.foodx) < self.food_size and abs(self.y1 - self.foody) < self.food_size:
-            self.foodx, self.foody = self.spawn_food()
-            self.length_of_snake += 1
-            self.score += 10
-            self.spawn_power_up()  # Chance to spawn a power-up after eating food
-
-        # Check for collision with obstacles
-        for obstacle in self.obstacles:
-            if abs(self.x1 - obstacle[0]) < self.snake_block and abs(self.y1 - obstacle[1]) < self.snake_block:
-                self.game_close = True
+        if not self.game_close:
+            self.save_replay()
+            self.finish_session()
+        self.shutdown()
+
+    def shutdown(self):
+        """Stops inputs and helpers, flushes what they wrote and closes pygame."""
+        # Inputs stop first so the inference thread is done with the trace
+        for backend in self.inputs:
+            backend.stop()
+        if self.spectator is not None:
+            self.spectator.stop()
+        if self.trace_writer is not None:
+            self.trace_writer.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        pygame.quit()
+
+    def poll_inputs(self):
+        # Earlier backends win, so a key press overrides a gesture
+        for backend in self.inputs:
+            direction = backend.poll()
+            if direction is not None:
+                return direction
+        return None
+
+    def step_input(self):
+        for backend in self.inputs:
+            direction = backend.before_step()
+            if direction is not None:
+                return direction
+        return None
+
+    def save_replay(self, directory="replays"):
+        if self.recorder is None or self.recorder.ticks == 0:
+            return
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.seed}.snkr"
+        self.recorder.save(os.path.join(directory, name))
+        self.recorder = None
+
+    def process_hand_results(self, results):
+        # Called on the inference thread for every processed camera frame
+        direction = None
+        if results.multi_hand_landmarks:
+            handedness = results.multi_handedness or []
+            for i, landmarks in enumerate(results.multi_hand_landmarks):
+                score = handedness[i].classification[0].score if i < len(handedness) else 1.0
+                sample = sample_from_landmarks(landmarks, score, time.perf_counter())
+                direction = self.gesture_filter.process(sample)
+        if self.trace_writer is not None:
+            self.trace_writer.write_frame(time.perf_counter(), results)
+        return direction
+
+    def finish_session(self):
+        """Queue the round's telemetry and ask for the leaderboard it ranks on."""
+        if self.telemetry is None or self.session is None or self.ticks == 0:
+            return
+        self.last_round = self.session.finish(self)
+        self.telemetry.submit(self.last_round)
+        self.leaderboard_reply = self.telemetry.request_leaderboard(self.input_mode, self.score)
+
+    def draw_leaderboard(self, board):
+        """Draws the high scores in the top-left corner and returns the rects."""
+        header = self.text.render(f"High scores ({board.input_mode})", 30, self.COLORS['WHITE'])
+        rects = [self.display.blit(header, [10, 10])]
+        y_offset = 45
+        for place, (score, ticks, cause, ended_at) in enumerate(board.rows, 1):
+            this_round = (self.last_round is not None
+                          and ended_at == self.last_round['ended_at'])
+            color = self.COLORS['YELLOW'] if this_round else self.COLORS['WHITE']
+            line = self.text.render(f"{place}. {score}  ({cause})", 25, color)
+            rects.append(self.display.blit(line, [10, y_offset]))
+            y_offset += 28
+
+        rank_text = self.text.render(f"Rank #{board.rank} of {board.total}", 35,
+                                     self.COLORS['WHITE'])
+        rank_rect = rank_text.get_rect(center=(self.width / 2, self.height / 2 + 60))
+        rects.append(self.display.blit(rank_text, rank_rect))
+        return rects
 
-        # Check for collision with power-ups
-        for power_up in self.power_ups:
-            if abs(self.x1 - power_up['position'][0]) < self.food_size and abs(self.y1 - power_up['position'][1]) < self.food_size:
-                self.apply_power_up(power_up['type'])
-                self.power_ups.remove(power_up)
     def handle_game_over(self):
         """Handles game over screen."""
         
@@ -498,60 +538,117 @@ class GameState:
         self.display.fill(self.COLORS['RED'])
         
         # Render game over text
-        font = pygame.font.SysFont("bahnschrift", 120)
-        game_over_text = font.render("Game Over!", True, self.COLORS['WHITE'])
+        game_over_text = self.text.render("Game Over!", 120, self.COLORS['WHITE'])
         text_rect = game_over_text.get_rect(center=(self.width / 2, self.height / 2 - 100))
         self.display.blit(game_over_text, text_rect)
         
         # Render final score
-        score_font = pygame.font.SysFont("bahnschrift", 60)
-        score_text = score_font.render(f"Final Score: {self.score}", True, self.COLORS['WHITE'])
+        score_text = self.text.render(f"Final Score: {self.score}", 60, self.COLORS['WHITE'])
         score_rect = score_text.get_rect(center=(self.width / 2, self.height / 2))
         self.display.blit(score_text, score_rect)
         
         # Render restart and quit options
-        restart_font = pygame.font.SysFont("bahnschrift", 40)
-        restart_text = restart_font.render("Press Space to Restart", True, self.COLORS['WHITE'])
+        restart_text = self.text.render("Press Space to Restart", 40, self.COLORS['WHITE'])
         restart_rect = restart_text.get_rect(center=(self.width / 2, self.height / 2 + 150))
         self.display.blit(restart_text, restart_rect)
         
-        quit_font = pygame.font.SysFont("bahnschrift", 40)
-        quit_text = quit_font.render("Press Q to Quit", True, self.COLORS['WHITE'])
+        quit_text = self.text.render("Press Q to Quit", 40, self.COLORS['WHITE'])
         quit_rect = quit_text.get_rect(center=(self.width / 2, self.height / 2 + 200))
         self.display.blit(quit_text, quit_rect)
         
         # Update display
         pygame.display.update()
         
-        # Wait for user input
+        # Wait for user input; the leaderboard appears once the store answers
         waiting = True
         while waiting:
+            if self.leaderboard_reply is not None:
+                board = self.leaderboard_reply.poll()
+                if board is not None:
+                    self.leaderboard_reply = None
+                    pygame.display.update(self.draw_leaderboard(board))
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit_game()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         self.init_game_variables()
                         waiting = False
                     elif event.key == pygame.K_q:
-                        pygame.quit()
-                        sys.exit()
+                        self.quit_game()
+            self.clock.tick(30)
+
+    def quit_game(self):
+        # Quitting outside the main loop still stops the camera and flushes files
+        self.shutdown()
+        sys.exit()
 
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.game_over = True
                 return True
+            for backend in self.inputs:
+                backend.handle_event(event)
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_p:  # Pause game
                     self.paused = not self.paused
                 if event.key == pygame.K_q:  # Quit game
                     self.game_over = True
                     return True
+                if event.key == pygame.K_F3:  # Toggle profiler overlay
+                    self.show_profiler = not self.show_profiler
+                    # The overlay needs samples; closing it leaves an F4 recording running
+                    if self.show_profiler:
+                        self.profiler.enabled = True
+                if event.key == pygame.K_F4:  # Start profiling, or export what was recorded
+                    if self.profiler.enabled and self.profiler.frames:
+                        paths = self.profiler.export()
+                        print("Profile written to " + " and ".join(paths))
+                    else:
+                        self.profiler.enabled = True
+                        print("Profiling started; press F4 again to export")
         return False
 
 # Game loop
 if __name__ == "__main__":
-    game = GameState()
+    parser = argparse.ArgumentParser(description="Snake & Apple AI Game")
+    parser.add_argument("--record-landmarks", metavar="PATH",
+                        help="write every frame's hand landmarks to a trace file")
+    parser.add_argument("--input", choices=sorted(INPUTS), default='gesture',
+                        help="steering input; 'autopilot' is a camera-free demo mode "
+                             "(arrow keys always work)")
+    parser.add_argument("--preview", action="store_true",
+                        help="show what the camera sees in a corner (F2 toggles it)")
+    parser.add_argument("--spectate", type=int, metavar="PORT",
+                        help="stream the game to spectators on localhost:PORT")
+    parser.add_argument("--no-telemetry", action="store_true",
+                        help="do not record rounds and high scores in telemetry/telemetry.db")
+    parser.add_argument("--world", metavar="COLSxROWS",
+                        help="play in a scrolling world of this many cells, e.g. 500x500")
+    add_level_arguments(parser)
+    args = parser.parse_args()
+
+    level = level_from_args(args, parser)
+    world_size = None
+    if args.world:
+        try:
+            world_size = tuple(int(n) for n in args.world.lower().split("x"))
+        except ValueError:
+            world_size = ()
+        if len(world_size) != 2 or min(world_size) < 1:
+            parser.error("--world expects COLSxROWS, e.g. 500x500")
+        if args.input == 'autopilot' or args.spectate or level:
+            parser.error("--world cannot be combined with the autopilot, spectators or levels")
+
+    game = GameState(world_size=world_size)
+    game.input_mode = args.input
+    game.show_camera_preview = args.preview
+    game.level = level
+    if args.spectate:
+        game.spectator = SpectatorServer(port=args.spectate)
+    if not args.no_telemetry:
+        game.telemetry = TelemetryStore()
+    if args.record_landmarks:
+        game.trace_writer = TraceWriter(args.record_landmarks)
     game.run_game()
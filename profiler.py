@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Main-loop stages, in the order run_game marks them
+LOOP_STAGES = ['events', 'input', 'simulate', 'draw', 'flip', 'tick']
+# Stages timed on the gesture pipeline's worker threads
+WORKER_STAGES = ['camera', 'inference']
+
+
+class FrameProfiler:
+    """Per-stage frame timings with rolling percentiles and trace export.
+
+    The game loop calls ``begin_frame`` once per frame, ``mark(stage)`` after
+    each stage and ``end_frame`` at the end; each mark costs one
+    ``perf_counter`` call. Worker threads report their own spans with
+    ``add``. While ``enabled`` is False every method returns immediately;
+    enabling it mid-frame takes effect at the next ``begin_frame``.
+    """
+
+    def __init__(self, history=600, trace_frames=10000):
+        self.enabled = False
+        self.stages = LOOP_STAGES + WORKER_STAGES
+        self.samples = {stage: deque(maxlen=history) for stage in self.stages + ['frame']}
+        self.frames = deque(maxlen=trace_frames)
+        self.worker_spans = deque(maxlen=trace_frames * len(WORKER_STAGES))
+        self.frame_index = 0
+        self._frame_start = None  # None until a frame begins while enabled
+        self._last = 0.0
+        self._current = {}
+        self._lock = threading.Lock()
+
+    def begin_frame(self):
+        if not self.enabled:
+            self._frame_start = None
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._current = {}
+
+    def mark(self, stage):
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter()
+        self._current[stage] = self._current.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None or not self._current:
+            return
+        total = self._last - self._frame_start
+        for stage, seconds in self._current.items():
+            self.samples[stage].append(seconds)
+        self.samples['frame'].append(total)
+        self.frames.append((self.frame_index, self._frame_start, total, self._current))
+        self.frame_index += 1
+        self._frame_start = None
+        self._current = {}
+
+    def add(self, stage, start, end):
+        """Record a span measured on another thread."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.samples[stage].append(end - start)
+        self.worker_spans.append((stage, threading.current_thread().name, start, end))
+
+    def percentiles(self, stage):
+        """Return (p50, p95, p99) in milliseconds, or None without samples."""
+        with self._lock:
+            values = sorted(self.samples[stage])
+        if not values:
+            return None
+        last = len(values) - 1
+        return tuple(values[min(last, int(q * len(values)))] * 1000.0 for q in (0.5, 0.95, 0.99))
+
+    def summary(self):
+        return {stage: self.percentiles(stage) for stage in self.samples
+                if self.samples[stage]}
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'start_s', 'total_ms'] + [f'{s}_ms' for s in LOOP_STAGES])
+            for index, start, total, stages in list(self.frames):
+                writer.writerow([index, f"{start:.6f}", f"{total * 1000:.3f}"] +
+                                [f"{stages.get(s, 0.0) * 1000:.3f}" for s in LOOP_STAGES])
+
+    def export_chrome_trace(self, path):
+        """Write spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        events = []
+        for index, start, total, stages in list(self.frames):
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 0, 'tid': 'game',
+                           'ts': start * 1e6, 'dur': total * 1e6, 'args': {'frame': index}})
+            offset = start
+            for stage in LOOP_STAGES:
+                if stage in stages:
+                    events.append({'name': stage, 'ph': 'X', 'pid': 0, 'tid': 'game',
+                                   'ts': offset * 1e6, 'dur': stages[stage] * 1e6})
+                    offset += stages[stage]
+        for stage, thread, start, end in list(self.worker_spans):
+            events.append({'name': stage, 'ph': 'X', 'pid': 0, 'tid': thread,
+                           'ts': start * 1e6, 'dur': (end - start) * 1e6})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def export(self, directory="profiles"):
+        """Write both CSV and Chrome trace files and return their paths."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        csv_path = os.path.join(directory, f"frames-{stamp}.csv")
+        trace_path = os.path.join(directory, f"trace-{stamp}.json")
+        self.export_csv(csv_path)
+        self.export_chrome_trace(trace_path)
+        return csv_path, trace_path
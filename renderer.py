@@ -0,0 +1,225 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """Redraws only the cells that changed since the previous frame.
+
+    Obstacles never move within a level, so they are baked once into a
+    background surface together with the board color. Each frame the
+    renderer diffs the snake cells, food and power-ups against what it drew
+    last time, restores the background under changed cells, redraws whatever
+    now occupies them and returns just those rects for ``display.update``.
+    A full redraw happens on the first frame, when the level or display size
+    changes, or after ``invalidate``; ``render`` then returns None.
+
+    For interpolated frames the head and tail are drawn part-way between
+    cells; those moving rects are restored and redrawn every frame like the
+    HUD.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.background = None
+        self.level_version = None
+        self.display_size = None
+        self.drawn_snake = set()
+        self.drawn_snake_color = None
+        self.drawn_items = {}
+        self.hud_rects = []
+        self.motion_rects = []
+        self.drawn_sliding_head = None
+        self.full_redraws = 0
+
+    def invalidate(self):
+        self.level_version = None
+
+    def bake_background(self):
+        game = self.game
+        self.background = pygame.Surface(game.display.get_size()).convert()
+        self.background.fill(game.COLORS['BLUE'])
+        for obstacle in game.obstacles:
+            pygame.draw.rect(self.background, game.COLORS['BLACK'],
+                             [obstacle[0], obstacle[1], game.snake_block, game.snake_block])
+
+    def current_items(self):
+        game = self.game
+        items = {game.to_cell(game.foodx, game.foody): game.COLORS['GREEN']}
+        for power_up in game.power_ups:
+            items[game.to_cell(*power_up['position'])] = game.power_up_color(power_up['type'])
+        return items
+
+    def cell_rect(self, cell):
+        block = self.game.snake_block
+        return pygame.Rect(cell[0] * block, cell[1] * block, block, block)
+
+    def cells_under(self, rect):
+        block = self.game.snake_block
+        cols, rows = self.game.cols, self.game.rows
+        for cy in range(max(rect.top // block, 0), min((rect.bottom - 1) // block + 1, rows)):
+            for cx in range(max(rect.left // block, 0), min((rect.right - 1) // block + 1, cols)):
+                yield cx, cy
+
+    def draw_cell(self, cell, items, snake_cells, snake_color, sliding_head=None):
+        game = self.game
+        rect = self.cell_rect(cell)
+        game.display.blit(self.background, rect, rect)
+        color = items.get(cell)
+        if color is not None:
+            pygame.draw.rect(game.display, color,
+                             [rect.x, rect.y, game.food_size, game.food_size])
+        if cell in snake_cells and cell != sliding_head:
+            pygame.draw.rect(game.display, snake_color, rect)
+        return rect
+
+    def draw_motion(self, alpha, snake_color):
+        self.motion_rects = self.game.motion_rects(alpha)
+        for rect in self.motion_rects:
+            pygame.draw.rect(self.game.display, snake_color, rect)
+
+    def render(self, alpha=1.0):
+        game = self.game
+        items = self.current_items()
+        snake_cells = game.snake.cells
+        snake_color = game.snake_color()
+        sliding_head = game.sliding_head(alpha)
+
+        if (self.level_version != game.level_version
+                or self.display_size != game.display.get_size()):
+            self.render_full(items, snake_cells, snake_color, alpha, sliding_head)
+            return None
+
+        # Cells whose contents changed since the last frame
+        dirty_cells = self.drawn_snake.symmetric_difference(snake_cells)
+        if snake_color != self.drawn_snake_color:
+            dirty_cells.update(snake_cells)
+        for cell, color in items.items():
+            if self.drawn_items.get(cell) != color:
+                dirty_cells.add(cell)
+        for cell in self.drawn_items:
+            if cell not in items:
+                dirty_cells.add(cell)
+
+        # Clear the previous HUD and moving head/tail, redrawing any cells
+        # they were covering
+        dirty_rects = []
+        for rect in self.hud_rects + self.motion_rects:
+            game.display.blit(self.background, rect, rect)
+            dirty_cells.update(self.cells_under(rect))
+            dirty_rects.append(rect)
+        for cell in (sliding_head, self.drawn_sliding_head):
+            if cell is not None:
+                dirty_cells.add(cell)
+
+        for cell in dirty_cells:
+            dirty_rects.append(self.draw_cell(cell, items, snake_cells, snake_color, sliding_head))
+
+        self.draw_motion(alpha, snake_color)
+        dirty_rects.extend(self.motion_rects)
+        self.drawn_sliding_head = sliding_head
+        self.hud_rects = game.display_game_info()
+        dirty_rects.extend(self.hud_rects)
+
+        self.remember(items, snake_cells, snake_color)
+        return dirty_rects
+
+    def render_full(self, items, snake_cells, snake_color, alpha, sliding_head):
+        game = self.game
+        self.bake_background()
+        game.display.blit(self.background, (0, 0))
+        for cell in set(items).union(snake_cells):
+            self.draw_cell(cell, items, snake_cells, snake_color, sliding_head)
+        self.draw_motion(alpha, snake_color)
+        self.drawn_sliding_head = sliding_head
+        self.hud_rects = game.display_game_info()
+
+        self.level_version = game.level_version
+        self.display_size = game.display.get_size()
+        self.full_redraws += 1
+        self.remember(items, snake_cells, snake_color)
+
+    def remember(self, items, snake_cells, snake_color):
+        self.drawn_snake = set(snake_cells)
+        self.drawn_snake_color = snake_color
+        self.drawn_items = items
+
+
+class WorldRenderer:
+    """Draws the screen-sized window of a large world that follows the head.
+
+    The camera keeps the head (interpolated between ticks) in the middle of
+    the screen. Only the chunks overlapping the view are asked for their
+    obstacles and snake segments, so drawing costs the same however big the
+    world is. The whole view is redrawn every frame; ``render`` returns None.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.chunks_drawn = 0
+
+    def camera(self, alpha):
+        """Top-left corner of the view, in world pixels."""
+        game = self.game
+        hx, hy = game.snake.head
+        if alpha < 1.0 and game.prev_head is not None:
+            px, py = game.prev_head
+            if abs(hx - px) + abs(hy - py) == 1:
+                hx = px + (hx - px) * alpha
+                hy = py + (hy - py) * alpha
+        width, height = game.display.get_size()
+        block = game.snake_block
+        return (hx * block + block / 2 - width / 2, hy * block + block / 2 - height / 2)
+
+    def render(self, alpha=1.0):
+        game = self.game
+        display = game.display
+        block = game.snake_block
+        width, height = display.get_size()
+        world_width, world_height = game.cols * block, game.rows * block
+        cam_x, cam_y = self.camera(alpha)
+
+        def on_screen(cx, cy):
+            # Wrap-around: measure from the camera modulo the world size, in
+            # [-block, world size - block) so cells cut by the left and top
+            # edges keep their negative offset and are still drawn
+            x = (cx * block - cam_x + block) % world_width - block
+            y = (cy * block - cam_y + block) % world_height - block
+            if x >= width or y >= height:
+                return None
+            return round(x), round(y)
+
+        display.fill(game.COLORS['BLUE'])
+        chunks = game.grid.chunks_in_view(int(cam_x // block), int(cam_y // block),
+                                          width // block + 1, height // block + 1)
+        self.chunks_drawn = len(chunks)
+
+        black = game.COLORS['BLACK']
+        for chunk in chunks:
+            for cx, cy in chunk.obstacles:
+                position = on_screen(cx, cy)
+                if position is not None:
+                    pygame.draw.rect(display, black, [*position, block, block])
+
+        items = [(game.to_cell(game.foodx, game.foody), game.COLORS['GREEN'])]
+        for power_up in game.power_ups:
+            items.append((game.to_cell(*power_up['position']),
+                          game.power_up_color(power_up['type'])))
+        for cell, color in items:
+            position = on_screen(*cell)
+            if position is not None:
+                pygame.draw.rect(display, color, [*position, game.food_size, game.food_size])
+
+        snake_color = game.snake_color()
+        sliding_head = game.sliding_head(alpha)
+        for chunk in chunks:
+            for cell in chunk.snake:
+                position = on_screen(*cell)
+                if position is not None and cell != sliding_head:
+                    pygame.draw.rect(display, snake_color, [*position, block, block])
+        if sliding_head is not None:
+            # The camera follows the sliding head, so it sits mid-screen
+            head_x, head_y = game.lerp_rect(game.prev_head, sliding_head, alpha).topleft
+            position = on_screen(head_x / block, head_y / block)
+            pygame.draw.rect(display, snake_color, [*position, block, block])
+
+        game.display_game_info()
+        return None
@@ -0,0 +1,169 @@
+import argparse
+import os
+import struct
+import time
+
+from engine import Direction, SnakeEngine
+
+# File layout: a fixed header, the level parameters (if any) and the world
+# size (0 x 0 outside world mode), followed by run-length encoded inputs.
+# Each run is (direction code, tick count); code 0 means "no input on that
+# tick".
+MAGIC = b"SNKR"
+VERSION = 4
+HEADER = struct.Struct("<4sBQHHHHH")
+LEVEL = struct.Struct("<?QfBB")
+WORLD = struct.Struct("<II")
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+
+
+class ReplayRecorder:
+    """Collects the per-tick inputs of one round for replaying later."""
+
+    def __init__(self, engine):
+        self.header = HEADER.pack(MAGIC, VERSION, engine.seed, engine.width, engine.height,
+                                  engine.snake_block, engine.food_size, int(engine.base_speed))
+        level = engine.level
+        if level is None:
+            self.header += LEVEL.pack(False, 0, 0.0, 0, 0)
+        else:
+            self.header += LEVEL.pack(True, level['seed'], level['density'],
+                                      level['corridor_width'], level['clearance'])
+        if engine.world:
+            self.header += WORLD.pack(engine.cols, engine.rows)
+        else:
+            self.header += WORLD.pack(0, 0)
+        self.runs = bytearray()
+        self.code = None
+        self.count = 0
+        self.ticks = 0
+
+    def record(self, direction):
+        code = direction.value if direction is not None else 0
+        self.ticks += 1
+        if code == self.code and self.count < MAX_RUN:
+            self.count += 1
+            return
+        self._flush_run()
+        self.code = code
+        self.count = 1
+
+    def _flush_run(self):
+        if self.count:
+            self.runs += RUN.pack(self.code, self.count)
+        self.code = None
+        self.count = 0
+
+    def to_bytes(self):
+        data = self.header + bytes(self.runs)
+        if self.count:
+            data += RUN.pack(self.code, self.count)
+        return data
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class ReplayPlayer:
+    """Re-runs a recorded round, headless or on screen."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        (magic, version, self.seed, self.width, self.height,
+         self.snake_block, self.food_size, self.base_speed) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay file")
+        has_level, seed, density, corridor_width, clearance = LEVEL.unpack_from(data, HEADER.size)
+        self.level = None
+        if has_level:
+            # density went through a float32; round it back to what was typed
+            self.level = {'seed': seed, 'density': round(density, 6),
+                          'corridor_width': corridor_width, 'clearance': clearance}
+        cols, rows = WORLD.unpack_from(data, HEADER.size + LEVEL.size)
+        self.world_size = (cols, rows) if cols else None
+        start = HEADER.size + LEVEL.size + WORLD.size
+        self.runs = [RUN.unpack_from(data, offset)
+                     for offset in range(start, len(data), RUN.size)]
+
+    @property
+    def ticks(self):
+        return sum(count for _, count in self.runs)
+
+    def directions(self):
+        for code, count in self.runs:
+            direction = Direction(code) if code else None
+            for _ in range(count):
+                yield direction
+
+    def new_engine(self):
+        engine = SnakeEngine(self.width, self.height, self.snake_block,
+                             self.food_size, self.base_speed, world_size=self.world_size)
+        engine.level = self.level
+        engine.init_game_variables(self.seed)
+        return engine
+
+    def run_headless(self, engine=None):
+        """Step through every recorded tick as fast as possible."""
+        if engine is None:
+            engine = self.new_engine()
+        else:
+            engine.level = self.level
+            engine.init_game_variables(self.seed)
+        for direction in self.directions():
+            engine.step(direction)
+            if engine.game_close:
+                break
+        return engine
+
+    def run_rendered(self, speed=1.0):
+        """Play the round back on screen; ``speed`` scales the tick rate."""
+        import pygame
+        from main import GameState
+
+        game = GameState(self.width, self.height, world_size=self.world_size)
+        game.level = self.level
+        game.init_game_variables(self.seed)
+        for direction in self.directions():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                                 and event.key == pygame.K_q):
+                    pygame.quit()
+                    return game
+            game.step(direction)
+            game.render_frame()
+            if game.game_close:
+                break
+            if speed > 0:
+                game.clock.tick(game.snake_speed * speed)
+        pygame.quit()
+        return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Snake & Apple round.")
+    parser.add_argument("path", help="replay file (.snkr)")
+    parser.add_argument("--render", action="store_true", help="show the replay on screen")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="playback speed multiplier when rendering (0 = unthrottled)")
+    args = parser.parse_args()
+
+    player = ReplayPlayer(args.path)
+    start = time.perf_counter()
+    if args.render:
+        engine = player.run_rendered(args.speed)
+    else:
+        engine = player.run_headless()
+    elapsed = time.perf_counter() - start
+    print(f"seed={player.seed} ticks={engine.ticks}/{player.ticks} score={engine.score} "
+          f"game_over={engine.game_close} elapsed={elapsed:.3f}s "
+          f"({engine.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import heapq
+import itertools
+
+
+class ScheduledEvent:
+    """Handle for a scheduled callback; pass it to ``cancel`` to drop it."""
+
+    __slots__ = ('time', 'seq', 'action', 'args', 'active')
+
+    def __init__(self, time, seq, action, args):
+        self.time = time
+        self.seq = seq
+        self.action = action
+        self.args = args
+        self.active = True
+
+    def __lt__(self, other):
+        return (self.time, self.seq) < (other.time, other.seq)
+
+
+class EventScheduler:
+    """Priority queue of callbacks keyed on the game clock.
+
+    ``run_due(now)`` pops only the events whose time has come, so a tick
+    with nothing due costs a single comparison. Cancelled events stay in the
+    heap and are skipped when they surface. Events due at the same time run
+    in the order they were scheduled.
+    """
+
+    def __init__(self):
+        self.queue = []
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def clear(self):
+        self.queue.clear()
+
+    def schedule(self, time, action, *args):
+        event = ScheduledEvent(time, next(self.counter), action, args)
+        heapq.heappush(self.queue, event)
+        return event
+
+    def cancel(self, event):
+        if event is not None:
+            event.active = False
+
+    def run_due(self, now):
+        queue = self.queue
+        while queue and queue[0].time <= now:
+            event = heapq.heappop(queue)
+            if event.active:
+                event.active = False
+                event.action(*event.args)
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import base64
+import json
+import threading
+from collections import deque
+
+import numpy as np
+
+from grid import OBSTACLE
+
+# Wire format: one compact JSON object per line.
+#
+# Keyframes ({"k": 1, ...}) carry the whole board: size, walls as base64
+# packed bits, the body as its tail cell plus one move letter per segment,
+# food, power-ups, active effects and score. Deltas carry only what changed
+# on a tick: "h" new head cell, "d" tail dropped, "f" food cell, "p"
+# power-ups on the board, "a" active effects, "s" score and "o" round over.
+# A client that misses a delta is out of sync until the next keyframe.
+MOVE_LETTERS = {(0, -1): 'U', (0, 1): 'D', (-1, 0): 'L', (1, 0): 'R'}
+LETTER_MOVES = {letter: move for move, letter in MOVE_LETTERS.items()}
+
+
+def encode(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
+
+
+def wrap_step(a, b, cols, rows):
+    """The unit move from cell a to the adjacent cell b on the wrap-around grid."""
+    dx = (b[0] - a[0] + 1) % cols - 1
+    dy = (b[1] - a[1] + 1) % rows - 1
+    return dx, dy
+
+
+class SpectatorClient:
+    __slots__ = ('writer', 'synced')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.synced = False
+
+
+class SpectatorServer:
+    """Streams game state to local spectators from an asyncio loop on its own thread.
+
+    The game loop calls ``publish(engine)`` after every step. Deltas are
+    encoded on the game thread and handed to the event loop with
+    ``call_soon_threadsafe``, so the game never waits on a socket. Writes are
+    never awaited either: a client whose unsent data exceeds ``max_buffer``
+    bytes has deltas dropped and is resynchronised by the next keyframe, sent
+    every ``keyframe_interval`` ticks or as soon as someone needs one.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, keyframe_interval=100, max_buffer=64 * 1024):
+        self.host = host
+        self.port = port
+        self.keyframe_interval = keyframe_interval
+        self.max_buffer = max_buffer
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.clients = set()
+        self.keyframe_needed = True
+
+        self.last = None
+        self.last_keyframe_tick = None
+        self.level_version = None
+        self.sent_bytes = 0
+        self.dropped = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="spectator", daemon=True)
+        self.thread.start()
+        self.ready.wait(5.0)
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None:
+            self.thread.join(1.0)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            print(f"Spectator server could not listen on {self.host}:{self.port}: {e}")
+            self.ready.set()
+            return
+        print(f"Spectators can connect to {self.host}:{self.port}")
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            # Closing a client's writer ends its _handle at the next read;
+            # anything still pending after that is cancelled
+            for client in list(self.clients):
+                client.writer.close()
+            tasks = asyncio.all_tasks(self.loop)
+            if tasks:
+                self.loop.run_until_complete(asyncio.wait(tasks, timeout=1.0))
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.run_until_complete(
+                asyncio.gather(*asyncio.all_tasks(self.loop), return_exceptions=True))
+            self.loop.close()
+
+    async def _handle(self, reader, writer):
+        client = SpectatorClient(writer)
+        self.clients.add(client)
+        self.keyframe_needed = True
+        try:
+            # Spectators only listen; reading just tells us when they leave
+            while await reader.read(1024):
+                pass
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled only when the server shuts down
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def _send(self, data, keyframe):
+        for client in list(self.clients):
+            if not keyframe and not client.synced:
+                continue
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                # Too far behind: skip deltas until it can take a keyframe
+                client.synced = False
+                self.keyframe_needed = True
+                self.dropped += 1
+                continue
+            client.writer.write(data)
+            client.synced = True
+            self.sent_bytes += len(data)
+
+    def snapshot(self, engine):
+        """The per-tick fields deltas are computed from."""
+        return {
+            'f': list(engine.to_cell(engine.foodx, engine.foody)),
+            'p': [[p['type'].value, *engine.to_cell(*p['position'])] for p in engine.power_ups],
+            'a': sorted(t.name for t in engine.power_up_timers),
+            's': engine.score,
+        }
+
+    def keyframe(self, engine, state):
+        walls = np.frombuffer(bytes(engine.grid.kinds), dtype=np.uint8) == OBSTACLE
+        cells = list(engine.snake)
+        moves = ''.join(MOVE_LETTERS[wrap_step(a, b, engine.cols, engine.rows)]
+                        for a, b in zip(cells, cells[1:]))
+        message = {'k': 1, 't': engine.ticks, 'cols': engine.cols, 'rows': engine.rows,
+                   'walls': base64.b64encode(np.packbits(walls).tobytes()).decode(),
+                   'tail': list(cells[0]), 'body': moves, 'o': int(engine.game_close)}
+        message.update(state)
+        return message
+
+    def publish(self, engine):
+        """Send this tick's changes; call from the game loop after each step."""
+        if not self.clients or self.loop is None:
+            # Nobody is watching: the next spectator starts from a keyframe
+            self.keyframe_needed = True
+            return
+
+        state = self.snapshot(engine)
+        if (self.keyframe_needed or engine.level_version != self.level_version
+                or engine.ticks - self.last_keyframe_tick >= self.keyframe_interval):
+            self.keyframe_needed = False
+            self.level_version = engine.level_version
+            self.last_keyframe_tick = engine.ticks
+            message, keyframe = self.keyframe(engine, state), True
+        else:
+            message = {'t': engine.ticks}
+            if engine.prev_head is not None:
+                message['h'] = list(engine.snake.head)
+            if engine.prev_tail is not None:
+                message['d'] = 1
+            for field, value in state.items():
+                if value != self.last[field]:
+                    message[field] = value
+            if engine.game_close:
+                message['o'] = 1
+            keyframe = False
+        self.last = state
+        self.loop.call_soon_threadsafe(self._send, encode(message), keyframe)
+
+
+class SpectatorView:
+    """Rebuilds the game state from a spectator stream."""
+
+    def __init__(self):
+        self.synced = False
+        self.cols = self.rows = 0
+        self.walls = None
+        self.body = deque()
+        self.food = None
+        self.power_ups = []
+        self.active = []
+        self.score = 0
+        self.tick = 0
+        self.over = False
+
+    def apply(self, message):
+        if message.get('k'):
+            self.synced = True
+            self.cols, self.rows = message['cols'], message['rows']
+            bits = np.unpackbits(np.frombuffer(base64.b64decode(message['walls']), dtype=np.uint8),
+                                 count=self.cols * self.rows)
+            self.walls = bits.astype(bool).reshape(self.rows, self.cols)
+            x, y = message['tail']
+            self.body = deque([(x, y)])
+            for letter in message['body']:
+                dx, dy = LETTER_MOVES[letter]
+                x, y = (x + dx) % self.cols, (y + dy) % self.rows
+                self.body.append((x, y))
+        elif not self.synced:
+            return
+        self.tick = message['t']
+        if message.get('d'):
+            self.body.popleft()
+        if 'h' in message:
+            self.body.append(tuple(message['h']))
+        if 'f' in message:
+            self.food = tuple(message['f'])
+        self.power_ups = message.get('p', self.power_ups)
+        self.active = message.get('a', self.active)
+        self.score = message.get('s', self.score)
+        self.over = bool(message.get('o', 0))
+
+
+async def watch(host, port, out=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    view = SpectatorView()
+    received = 0
+    record = open(out, "wb") if out else None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            received += len(line)
+            if record is not None:
+                record.write(line)
+            message = json.loads(line)
+            was_over = view.over
+            view.apply(message)
+            if message.get('k'):
+                print(f"keyframe at tick {view.tick}: length={len(view.body)} score={view.score}")
+            elif view.over and not was_over:
+                print(f"round over at tick {view.tick}: score={view.score}")
+    finally:
+        writer.close()
+        if record is not None:
+            record.close()
+        print(f"{received} bytes received")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch (and optionally record) a running game.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--out", help="also save the raw stream (JSON lines) here")
+    args = parser.parse_args()
+    try:
+        asyncio.run(watch(args.host, args.port, args.out))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from capture import LatestValue
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    input TEXT NOT NULL,
+    seed INTEGER,
+    level TEXT,
+    ticks INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    cause TEXT NOT NULL,
+    power_ups INTEGER NOT NULL,
+    avg_frame_ms REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_leaderboard ON sessions (input, score DESC, ended_at);
+CREATE TABLE IF NOT EXISTS power_ups (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS power_ups_session ON power_ups (session_id);
+CREATE TABLE IF NOT EXISTS score_timeline (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    tick INTEGER NOT NULL,
+    score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS score_timeline_session ON score_timeline (session_id);
+"""
+
+
+class SessionTelemetry:
+    """What one round reports to the TelemetryStore.
+
+    ``step`` runs after every simulation step and ``frame`` after every
+    frame; both only touch memory. ``finish`` turns it all into a record.
+    """
+
+    def __init__(self, input_mode, level=None):
+        self.input_mode = input_mode
+        self.level = level
+        self.started_at = time.time()
+        self.timeline = []  # (tick, score) whenever the score changes
+        self.last_score = 0
+        self.frames = 0
+        self.frame_ms = 0.0
+
+    def step(self, engine):
+        if engine.score != self.last_score:
+            self.last_score = engine.score
+            self.timeline.append((engine.ticks, engine.score))
+
+    def frame(self, ms):
+        self.frames += 1
+        self.frame_ms += ms
+
+    def finish(self, engine):
+        return {
+            'started_at': self.started_at,
+            'ended_at': time.time(),
+            'input': self.input_mode,
+            'seed': engine.seed,
+            'level': json.dumps(self.level, sort_keys=True) if self.level else None,
+            'ticks': engine.ticks,
+            'score': engine.score,
+            'length': engine.length_of_snake,
+            'cause': engine.death_cause or 'quit',
+            'power_ups': {kind.name: count for kind, count in engine.power_ups_collected.items()},
+            'avg_frame_ms': self.frame_ms / self.frames if self.frames else None,
+            'timeline': self.timeline,
+        }
+
+
+class Leaderboard:
+    """Top scores for one input mode, plus where a given round placed."""
+
+    def __init__(self, input_mode, rows, rank, total):
+        self.input_mode = input_mode
+        self.rows = rows    # (score, ticks, cause, ended_at), best first
+        self.rank = rank    # 1-based place of the asked-about score
+        self.total = total  # rounds played in this input mode
+
+
+class TelemetryStore:
+    """High scores and per-round telemetry in a local SQLite database.
+
+    The game thread only ever puts items on a queue: a background thread
+    owns the connection, writes whatever has queued up in one transaction
+    and answers leaderboard requests after those writes, so a round's own
+    score is already ranked. The database runs in WAL mode, so ``python
+    telemetry.py`` can read it while a game is writing.
+    """
+
+    def __init__(self, path=os.path.join("telemetry", "telemetry.db"), batch_size=64):
+        self.path = path
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.written = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def submit(self, record):
+        """Queue a finished round's record; returns at once."""
+        self.queue.put(('session', record))
+
+    def request_leaderboard(self, input_mode, score, limit=5):
+        """Ask for the top ``limit`` scores; poll the returned LatestValue for a Leaderboard."""
+        reply = LatestValue()
+        self.queue.put(('leaderboard', (input_mode, score, limit), reply))
+        return reply
+
+    def close(self, timeout=5.0):
+        """Write everything still queued and stop the writer thread."""
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = connect(self.path)
+        except (OSError, sqlite3.Error) as e:
+            self.error = f"Telemetry disabled: {e}"
+            print(self.error)
+            connection = None
+
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            # Take whatever else is already waiting, up to batch_size
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            sessions = [item[1] for item in batch if item is not None and item[0] == 'session']
+            requests = [item for item in batch if item is not None and item[0] == 'leaderboard']
+            running = None not in batch
+
+            if connection is None:
+                continue
+            try:
+                if sessions:
+                    write_sessions(connection, sessions)
+                    self.written += len(sessions)
+                for _, (input_mode, score, limit), reply in requests:
+                    reply.put(leaderboard(connection, input_mode, score, limit))
+            except sqlite3.Error as e:
+                print(f"Telemetry write failed: {e}")
+
+        if connection is not None:
+            connection.close()
+
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only risks the last transactions on power loss
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def write_sessions(connection, records):
+    with connection:
+        for record in records:
+            cursor = connection.execute(
+                "INSERT INTO sessions (started_at, ended_at, input, seed, level, ticks, score,"
+                " length, cause, power_ups, avg_frame_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (record['started_at'], record['ended_at'], record['input'], record['seed'],
+                 record['level'], record['ticks'], record['score'], record['length'],
+                 record['cause'], sum(record['power_ups'].values()), record['avg_frame_ms']))
+            session_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO power_ups (session_id, type, count) VALUES (?, ?, ?)",
+                [(session_id, kind, count) for kind, count in record['power_ups'].items()])
+            connection.executemany(
+                "INSERT INTO score_timeline (session_id, tick, score) VALUES (?, ?, ?)",
+                [(session_id, tick, score) for tick, score in record['timeline']])
+
+
+def leaderboard(connection, input_mode, score, limit=5):
+    # Both queries are served by the (input, score DESC) index
+    rows = connection.execute(
+        "SELECT score, ticks, cause, ended_at FROM sessions WHERE input = ?"
+        " ORDER BY score DESC, ended_at LIMIT ?", (input_mode, limit)).fetchall()
+    better, total = connection.execute(
+        "SELECT COUNT(*) FILTER (WHERE score > ?), COUNT(*) FROM sessions WHERE input = ?",
+        (score, input_mode)).fetchone()
+    return Leaderboard(input_mode, rows, better + 1, total)
+
+
+def summary(connection, input_mode=None):
+    where, args = ("WHERE input = ?", (input_mode,)) if input_mode else ("", ())
+    rounds, best, mean, ticks, frame_ms = connection.execute(
+        f"SELECT COUNT(*), MAX(score), AVG(score), AVG(ticks), AVG(avg_frame_ms)"
+        f" FROM sessions {where}", args).fetchone()
+    causes = connection.execute(
+        f"SELECT cause, COUNT(*) FROM sessions {where} GROUP BY cause ORDER BY COUNT(*) DESC",
+        args).fetchall()
+    return rounds, best, mean, ticks, frame_ms, causes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the high scores and round telemetry.")
+    parser.add_argument("--db", default=os.path.join("telemetry", "telemetry.db"))
+    parser.add_argument("--input", default='gesture', help="input mode to rank (default: gesture)")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No telemetry at {args.db} yet")
+        return
+    connection = connect(args.db)
+    board = leaderboard(connection, args.input, 0, args.limit)
+    print(f"High scores ({args.input}, {board.total} rounds):")
+    for place, (score, ticks, cause, ended_at) in enumerate(board.rows, 1):
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(ended_at))
+        print(f"  {place:>2}. {score:>6}  {ticks:>6} ticks  {cause:<10} {when}")
+
+    rounds, best, mean, ticks, frame_ms, causes = summary(connection)
+    if rounds:
+        print(f"All inputs: {rounds} rounds, best={best} mean score={mean:.1f} "
+              f"mean ticks={ticks:.0f}"
+              + (f" mean frame={frame_ms:.2f}ms" if frame_ms is not None else ""))
+        for cause, count in causes:
+            print(f"  {cause:<10} {count:>6} ({count / rounds:.1%})")
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class TextRenderer:
+    """Shared cache of fonts and rendered text surfaces.
+
+    Fonts are loaded once per (name, size, bold). Rendered surfaces are
+    memoized by (text, font, color, antialias) and evicted least recently
+    used first once ``max_surfaces`` is exceeded. Cached surfaces are shared,
+    so callers that fade text should call ``set_alpha`` before every blit.
+    """
+
+    def __init__(self, max_surfaces=256):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, name, size, bold=False):
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, size, color, name="bahnschrift", bold=False, antialias=True):
+        key = (text, name, size, bold, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(name, size, bold).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
@@ -0,0 +1,203 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+from autopilot import Autopilot
+from engine import Direction, SnakeEngine
+from levels import add_level_arguments, level_from_args
+
+MOVES = (Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT)
+SCRIPT_MOVES = {'U': Direction.UP, 'D': Direction.DOWN, 'L': Direction.LEFT,
+                'R': Direction.RIGHT, '.': None}
+FIELDS = ('seed', 'score', 'ticks', 'length', 'cause', 'seconds')
+
+
+class RandomController:
+    """Keeps going straight, turning at random with probability ``turn_chance``."""
+
+    def __init__(self, engine, seed, turn_chance=0.2):
+        self.rng = random.Random(seed)
+        self.turn_chance = turn_chance
+
+    def decide(self):
+        if self.rng.random() < self.turn_chance:
+            return self.rng.choice(MOVES)
+        return None
+
+
+class ScriptedController:
+    """Replays a fixed move pattern such as ``"RRRD"`` (``.`` means no input).
+
+    The default script sweeps the board row by row: a full row to the right,
+    then one step down.
+    """
+
+    def __init__(self, engine, seed, script=None):
+        if script is None:
+            script = "R" * (engine.cols - 1) + "D"
+        self.moves = [SCRIPT_MOVES[move] for move in script.upper()]
+        self.position = 0
+
+    def decide(self):
+        move = self.moves[self.position]
+        self.position = (self.position + 1) % len(self.moves)
+        return move
+
+
+def pathfinding_controller(engine, seed):
+    return Autopilot(engine)
+
+
+CONTROLLERS = {
+    'random': RandomController,
+    'scripted': ScriptedController,
+    'pathfinding': pathfinding_controller,
+}
+
+# Per-process engine, built once by the pool initializer
+_worker = None
+
+
+def init_worker(width, height, controller, max_steps, level):
+    global _worker
+    engine = SnakeEngine(width, height)
+    engine.level = level
+    _worker = (engine, CONTROLLERS[controller], max_steps)
+
+
+def play(engine, controller, seed, max_steps):
+    """Play one seeded game and return its compact result record."""
+    start = time.perf_counter()
+    engine.init_game_variables(seed=seed)
+    pilot = controller(engine, seed)
+    for _ in range(max_steps):
+        if not engine.step(pilot.decide()):
+            break
+    cause = engine.death_cause or 'timeout'
+    return (seed, engine.score, engine.ticks, engine.length_of_snake, cause,
+            time.perf_counter() - start)
+
+
+def play_batch(seeds):
+    """Pool task: play a range of seeds in this worker's engine."""
+    engine, controller, max_steps = _worker
+    return [play(engine, controller, seed, max_steps) for seed in seeds]
+
+
+class TournamentStats:
+    """Running aggregates over result records, in memory bounded by the score range."""
+
+    def __init__(self):
+        self.games = 0
+        self.steps = 0
+        self.game_seconds = 0.0
+        self.scores = Counter()
+        self.causes = Counter()
+        self.ticks_total = 0
+        self.ticks_min = None
+        self.ticks_max = 0
+
+    def add(self, record):
+        seed, score, ticks, length, cause, seconds = record
+        self.games += 1
+        self.steps += ticks
+        self.game_seconds += seconds
+        self.scores[score] += 1
+        self.causes[cause] += 1
+        self.ticks_total += ticks
+        self.ticks_min = ticks if self.ticks_min is None else min(self.ticks_min, ticks)
+        self.ticks_max = max(self.ticks_max, ticks)
+
+    def score_percentile(self, fraction):
+        target = fraction * (self.games - 1)
+        seen = 0
+        for score in sorted(self.scores):
+            seen += self.scores[score]
+            if seen > target:
+                return score
+        return 0
+
+    def format(self, elapsed):
+        if not self.games:
+            return "No games played"
+        mean = sum(score * count for score, count in self.scores.items()) / self.games
+        lines = [
+            f"{self.games} games, {self.steps} steps in {elapsed:.1f}s "
+            f"({self.steps / max(elapsed, 1e-9):.0f} steps/s, "
+            f"{self.steps / max(self.game_seconds, 1e-9):.0f} steps/s per worker)",
+            f"score mean={mean:.1f} p50={self.score_percentile(0.5)} "
+            f"p90={self.score_percentile(0.9)} p99={self.score_percentile(0.99)} "
+            f"max={max(self.scores)}",
+            f"survival ticks mean={self.ticks_total / self.games:.0f} "
+            f"min={self.ticks_min} max={self.ticks_max}",
+            "cause of death:",
+        ]
+        for cause, count in self.causes.most_common():
+            lines.append(f"  {cause:<10} {count:>8} ({count / self.games:.1%})")
+        return "\n".join(lines)
+
+
+def batches(first_seed, games, batch_size):
+    for start in range(first_seed, first_seed + games, batch_size):
+        yield range(start, min(start + batch_size, first_seed + games))
+
+
+def run_tournament(games, controller, out, width=800, height=600, max_steps=10000,
+                   seed=0, workers=None, batch_size=50, level=None):
+    """Play ``games`` seeded games across a process pool, streaming records to ``out``.
+
+    Returns the TournamentStats and the wall-clock time taken.
+    """
+    directory = os.path.dirname(out)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    stats = TournamentStats()
+    start = time.perf_counter()
+    with open(out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        with multiprocessing.Pool(workers, initializer=init_worker,
+                                  initargs=(width, height, controller, max_steps, level)) as pool:
+            # Batches finish in any order; each is written and dropped at once
+            for records in pool.imap_unordered(play_batch, batches(seed, games, batch_size)):
+                for record in records:
+                    stats.add(record)
+                writer.writerows((s, score, ticks, length, cause, f"{seconds:.6f}")
+                                 for s, score, ticks, length, cause, seconds in records)
+                f.flush()
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded headless games in parallel.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--controller", choices=sorted(CONTROLLERS), default='pathfinding')
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-steps", type=int, default=10000,
+                        help="games still running after this many steps end as 'timeout'")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--batch-size", type=int, default=50, help="games per worker task")
+    add_level_arguments(parser)
+    parser.add_argument("--out", help="CSV of per-game results "
+                                      "(default: tournaments/<time>-<controller>.csv)")
+    args = parser.parse_args()
+    level = level_from_args(args, parser)
+
+    out = args.out or os.path.join(
+        "tournaments", f"{time.strftime('%Y%m%d-%H%M%S')}-{args.controller}.csv")
+    stats, elapsed = run_tournament(args.games, args.controller, out, args.width, args.height,
+                                    args.max_steps, args.seed, args.workers, args.batch_size,
+                                    level)
+    print(stats.format(elapsed))
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
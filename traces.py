@@ -0,0 +1,158 @@
+import argparse
+import os
+import struct
+import time
+from collections import Counter
+
+import numpy as np
+
+from gestures import INDEX_FINGER_MCP, INDEX_FINGER_TIP, GestureSample, build_filter_chain
+
+# File layout: a fixed header followed by fixed-size records, one per
+# detected hand. Frames without a hand get a single record with handedness -1
+# and NaN landmarks so the timing of the recording is preserved.
+MAGIC = b"SNKT"
+VERSION = 1
+NUM_LANDMARKS = 21
+HEADER = struct.Struct("<4sBB2x")
+RECORD = np.dtype([
+    ('timestamp', '<f8'),
+    ('frame', '<u4'),
+    ('handedness', 'i1'),   # 0 = left, 1 = right, -1 = no hand
+    ('hand_index', 'u1'),
+    ('pad', 'V2'),
+    ('score', '<f4'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),
+])
+
+NO_HAND = -1
+HANDEDNESS = {'Left': 0, 'Right': 1}
+
+
+class TraceWriter:
+    """Appends each frame's ``multi_hand_landmarks`` to a binary trace."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS))
+        self.frame = 0
+
+    def write_frame(self, timestamp, results):
+        hands = results.multi_hand_landmarks or []
+        handedness = results.multi_handedness or []
+        records = np.zeros(max(len(hands), 1), dtype=RECORD)
+        records['timestamp'] = timestamp
+        records['frame'] = self.frame
+        if not hands:
+            records['handedness'] = NO_HAND
+            records['landmarks'] = np.nan
+        for i, hand in enumerate(hands):
+            records['hand_index'][i] = i
+            if i < len(handedness):
+                classification = handedness[i].classification[0]
+                records['handedness'][i] = HANDEDNESS.get(classification.label, NO_HAND)
+                records['score'][i] = classification.score
+            records['landmarks'][i] = [(p.x, p.y, p.z) for p in hand.landmark]
+        self.file.write(records.tobytes())
+        self.frame += 1
+
+    def close(self):
+        self.file.close()
+
+
+class TracePoint:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class TraceLandmarks:
+    """Looks like MediaPipe's NormalizedLandmarkList, backed by one record."""
+
+    __slots__ = ('record',)
+
+    def __init__(self, record):
+        self.record = record
+
+    @property
+    def landmark(self):
+        return self
+
+    def __getitem__(self, index):
+        x, y, z = self.record['landmarks'][index]
+        return TracePoint(float(x), float(y), float(z))
+
+    def __len__(self):
+        return NUM_LANDMARKS
+
+
+class TraceReader:
+    """Memory-maps a landmark trace so it can be streamed without loading it."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, num_landmarks = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or num_landmarks != NUM_LANDMARKS:
+            raise ValueError(f"{path} is not a version {VERSION} landmark trace")
+        size = os.path.getsize(path) - HEADER.size
+        count = size // RECORD.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=RECORD, mode='r',
+                                     offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        if not len(self.records):
+            return 0.0
+        return float(self.records['timestamp'][-1] - self.records['timestamp'][0])
+
+    def hands(self):
+        """Yield (timestamp, landmarks) for every detected hand."""
+        for record in self.records:
+            if record['handedness'] != NO_HAND:
+                yield float(record['timestamp']), TraceLandmarks(record)
+
+    def samples(self, chunk_size=65536):
+        """Yield a GestureSample per detected hand, computed a chunk at a time."""
+        for start in range(0, len(self.records), chunk_size):
+            chunk = self.records[start:start + chunk_size]
+            chunk = chunk[chunk['handedness'] != NO_HAND]
+            tips = chunk['landmarks'][:, INDEX_FINGER_TIP]
+            mcps = chunk['landmarks'][:, INDEX_FINGER_MCP]
+            deltas = (tips - mcps).tolist()
+            for (dx, dy, _), score, timestamp in zip(deltas, chunk['score'].tolist(),
+                                                     chunk['timestamp'].tolist()):
+                yield GestureSample(dx, dy, score, timestamp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay a landmark trace.")
+    parser.add_argument("path", help="trace file (.snkt)")
+    parser.add_argument("--raw", action="store_true",
+                        help="classify with a plain threshold instead of the default filters")
+    args = parser.parse_args()
+
+    reader = TraceReader(args.path)
+    chain = build_filter_chain([{'type': 'threshold'}] if args.raw else None)
+    start = time.perf_counter()
+    counts = Counter(direction.name for direction in chain.run(reader.samples()))
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"{len(reader)} records, {total} hands, {reader.duration:.1f}s recorded")
+    print(f"filtered in {elapsed:.3f}s ({total / max(elapsed, 1e-9):.0f} samples/s)")
+    for name, count in counts.most_common():
+        print(f"  {name:<8} {count}")
+
+
+if __name__ == "__main__":
+    main()
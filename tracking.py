@@ -0,0 +1,190 @@
+import time
+
+import cv2
+import numpy as np
+
+# Bones of MediaPipe's 21-point hand model, as landmark index pairs
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+class AdaptiveHandTracker:
+    """Feeds MediaPipe Hands the smallest image that still tracks the hand.
+
+    Three savings on top of plain ``hands.process`` on every full frame:
+
+    * frames are downscaled so their width is at most ``inference_width``;
+    * while a hand is tracked, only a region of interest around its last
+      landmarks (padded by ``roi_margin``) is processed, falling back to the
+      whole frame once tracking is lost;
+    * while the hand holds still, inference is skipped, but never for longer
+      than ``latency_budget`` seconds so a new gesture is seen in time.
+
+    Landmarks in the returned results are mapped back to normalized
+    coordinates of the full mirrored frame, exactly as if the whole frame had
+    been processed. ``process`` returns None for skipped frames, meaning the
+    previous result still stands. With ``adaptive=False`` every frame is
+    processed at full size, as before.
+
+    Resizing, mirroring and colour conversion write into scratch buffers
+    that are kept between frames, so once they have grown to the largest
+    crop seen no image memory is allocated per frame.
+    """
+
+    def __init__(self, hands, adaptive=True, inference_width=320, roi_margin=0.35,
+                 min_roi=0.3, stable_threshold=0.01, latency_budget=0.1):
+        self.hands = hands
+        self.adaptive = adaptive
+        self.inference_width = inference_width
+        self.roi_margin = roi_margin
+        self.min_roi = min_roi
+        self.stable_threshold = stable_threshold
+        self.latency_budget = latency_budget
+
+        self.roi = None  # (x0, y0, x1, y1) in mirrored, normalized coordinates
+        self.last_points = None
+        self.stable = False
+        self.last_inference = 0.0
+        self.last_hands = None
+        self.buffers = {}
+
+        self.processed = 0
+        self.skipped = 0
+        self.cropped = 0
+        self.pixels = 0
+
+    def __enter__(self):
+        self.hands.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.hands.__exit__(*exc_info)
+
+    def scratch(self, name, shape):
+        """A C-contiguous uint8 array of ``shape``, reusing the named buffer's memory."""
+        size = shape[0] * shape[1] * shape[2]
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = self.buffers[name] = np.empty(size, dtype=np.uint8)
+        return buffer[:size].reshape(shape)
+
+    def to_rgb(self, image):
+        """Mirror a BGR image and convert it to RGB, in scratch buffers."""
+        mirrored = cv2.flip(image, 1, dst=self.scratch('mirrored', image.shape))
+        return cv2.cvtColor(mirrored, cv2.COLOR_BGR2RGB, dst=self.scratch('rgb', image.shape))
+
+    def process(self, frame):
+        """Run inference on a raw (unmirrored BGR) camera frame."""
+        now = time.perf_counter()
+        if not self.adaptive:
+            frame_rgb = self.to_rgb(frame)
+            self.processed += 1
+            self.pixels += frame_rgb.shape[0] * frame_rgb.shape[1]
+            results = self.hands.process(frame_rgb)
+            self.last_hands = results.multi_hand_landmarks
+            return results
+
+        if self.stable and now - self.last_inference < self.latency_budget:
+            self.skipped += 1
+            return None
+        self.last_inference = now
+
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self.roi if self.roi is not None else (0.0, 0.0, 1.0, 1.0)
+        # The frame is not mirrored yet, so a mirrored x range [x0, x1]
+        # is the raw pixel range [width * (1 - x1), width * (1 - x0)].
+        left, right = int(width * (1.0 - x1)), int(width * (1.0 - x0))
+        top, bottom = int(height * y0), int(height * y1)
+        crop = frame[top:bottom, left:right]
+
+        crop_height, crop_width = crop.shape[:2]
+        if crop_width > self.inference_width:
+            scale = self.inference_width / crop_width
+            small_height = max(1, int(crop_height * scale))
+            crop = cv2.resize(crop, (self.inference_width, small_height),
+                              dst=self.scratch('small', (small_height, self.inference_width, 3)),
+                              interpolation=cv2.INTER_AREA)
+        crop_rgb = self.to_rgb(crop)
+
+        results = self.hands.process(crop_rgb)
+        self.processed += 1
+        self.pixels += crop_rgb.shape[0] * crop_rgb.shape[1]
+        if self.roi is not None:
+            self.cropped += 1
+
+        if results.multi_hand_landmarks:
+            span_x, span_y = x1 - x0, y1 - y0
+            for hand in results.multi_hand_landmarks:
+                for landmark in hand.landmark:
+                    landmark.x = x0 + landmark.x * span_x
+                    landmark.y = y0 + landmark.y * span_y
+            self.update_roi(results.multi_hand_landmarks[0])
+            self.last_hands = results.multi_hand_landmarks
+        else:
+            # Tracking lost: look at the whole frame again next time
+            self.roi = None
+            self.last_points = None
+            self.stable = False
+            self.last_hands = None
+        return results
+
+    def draw_preview(self, frame, dst):
+        """Draw the mirrored RGB frame into ``dst`` with the last landmarks and region of interest.
+
+        ``dst`` is a preallocated (height, width, 3) uint8 array; the frame is
+        scaled to fit it.
+        """
+        height, width = dst.shape[:2]
+        small = cv2.resize(frame, (width, height), dst=self.scratch('preview', dst.shape),
+                           interpolation=cv2.INTER_AREA)
+        mirrored = cv2.flip(small, 1, dst=self.scratch('preview_mirrored', dst.shape))
+        cv2.cvtColor(mirrored, cv2.COLOR_BGR2RGB, dst=dst)
+
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            cv2.rectangle(dst, (int(x0 * width), int(y0 * height)),
+                          (int(x1 * width) - 1, int(y1 * height) - 1), (255, 255, 0), 1)
+        for hand in self.last_hands or ():
+            points = [(int(landmark.x * width), int(landmark.y * height))
+                      for landmark in hand.landmark]
+            for start, end in HAND_CONNECTIONS:
+                cv2.line(dst, points[start], points[end], (0, 255, 0), 1)
+            for point in points:
+                cv2.circle(dst, point, 2, (213, 50, 80), -1)
+
+    def update_roi(self, hand):
+        xs = [landmark.x for landmark in hand.landmark]
+        ys = [landmark.y for landmark in hand.landmark]
+        points = (xs, ys)
+
+        if self.last_points is not None:
+            moved = sum(abs(x - px) + abs(y - py) for x, y, px, py in
+                        zip(xs, ys, *self.last_points)) / len(xs)
+            self.stable = moved < self.stable_threshold
+        self.last_points = points
+
+        x0, x1 = self._span(min(xs), max(xs))
+        y0, y1 = self._span(min(ys), max(ys))
+        self.roi = (x0, y0, x1, y1)
+
+    def _span(self, low, high):
+        """Pad [low, high] by the margin and the minimum size, clamped to [0, 1]."""
+        size = max((high - low) * (1.0 + 2.0 * self.roi_margin), self.min_roi)
+        center = (low + high) / 2.0
+        low = min(max(center - size / 2.0, 0.0), max(1.0 - size, 0.0))
+        return low, min(low + size, 1.0)
+
+    def stats(self):
+        frames = self.processed + self.skipped
+        return {
+            'processed': self.processed,
+            'skipped': self.skipped,
+            'cropped': self.cropped,
+            'skip_ratio': self.skipped / frames if frames else 0.0,
+            'avg_pixels': self.pixels / self.processed if self.processed else 0,
+        }
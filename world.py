@@ -0,0 +1,129 @@
+import random
+
+from grid import EMPTY, OBSTACLE, BoardFullError
+
+
+class Chunk:
+    """One chunk_size x chunk_size square of the world."""
+
+    __slots__ = ('kinds', 'snake', 'obstacles')
+
+    def __init__(self, size):
+        self.kinds = bytearray(size * size)
+        self.snake = {}       # (cx, cy) -> segment count
+        self.obstacles = []   # (cx, cy) cells, for drawing
+
+
+class ChunkedGrid:
+    """Occupancy for worlds much larger than the screen, stored in chunks.
+
+    Offers the same cell interface as OccupancyGrid, so SnakeEngine runs on
+    it unchanged. A chunk is only generated the first time one of its cells
+    is looked at; its obstacles come from a generator seeded by the round
+    seed and the chunk position, so the world is the same whatever order it
+    is explored in. Random free cells are picked within ``spawn_radius`` of
+    the snake's head (the last cell added), since the rest of the world may
+    not exist yet, and farther out only when that area is crowded; the world
+    is never considered full.
+    """
+
+    def __init__(self, cols, rows, chunk_size=16, density=0.02, clearance=3, spawn_radius=10):
+        self.cols = cols
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.density = density
+        self.clearance = clearance
+        self.spawn_radius = spawn_radius
+        self.seed = 0
+        self.clear()
+
+    def clear(self):
+        self.chunks = {}
+        self.focus = (self.cols // 2, self.rows // 2)
+
+    def chunk(self, chx, chy):
+        chunk = self.chunks.get((chx, chy))
+        if chunk is None:
+            chunk = self.chunks[(chx, chy)] = self.generate(chx, chy)
+        return chunk
+
+    def generate(self, chx, chy):
+        size = self.chunk_size
+        chunk = Chunk(size)
+        rng = random.Random(f"{self.seed}:{chx}:{chy}")
+        start_x, start_y = self.cols // 2, self.rows // 2
+        for ly in range(size):
+            cy = chy * size + ly
+            for lx in range(size):
+                cx = chx * size + lx
+                if rng.random() >= self.density or cx >= self.cols or cy >= self.rows:
+                    continue
+                # Keep the start area clear
+                if (abs(cx - start_x) <= self.clearance
+                        and abs(cy - start_y) <= self.clearance):
+                    continue
+                chunk.kinds[ly * size + lx] = OBSTACLE
+                chunk.obstacles.append((cx, cy))
+        return chunk
+
+    def _locate(self, cx, cy):
+        size = self.chunk_size
+        return self.chunk(cx // size, cy // size), (cy % size) * size + cx % size
+
+    def kind(self, cx, cy):
+        chunk, i = self._locate(cx, cy)
+        return chunk.kinds[i]
+
+    def has_snake(self, cx, cy):
+        chunk, _ = self._locate(cx, cy)
+        return (cx, cy) in chunk.snake
+
+    def is_free(self, cx, cy):
+        chunk, i = self._locate(cx, cy)
+        return chunk.kinds[i] == EMPTY and (cx, cy) not in chunk.snake
+
+    def set_kind(self, cx, cy, kind):
+        chunk, i = self._locate(cx, cy)
+        chunk.kinds[i] = kind
+
+    def add_snake(self, cx, cy):
+        chunk, _ = self._locate(cx, cy)
+        chunk.snake[(cx, cy)] = chunk.snake.get((cx, cy), 0) + 1
+        self.focus = (cx, cy)
+
+    def remove_snake(self, cx, cy):
+        chunk, _ = self._locate(cx, cy)
+        count = chunk.snake[(cx, cy)] - 1
+        if count:
+            chunk.snake[(cx, cy)] = count
+        else:
+            del chunk.snake[(cx, cy)]
+
+    def is_full(self):
+        return False
+
+    def random_free(self, rng, attempts=100):
+        """Return a random free (cx, cy) near the head, or raise BoardFullError.
+
+        When ``attempts`` picks within the radius all miss, the radius doubles
+        and the search goes on farther out, until it spans the whole world.
+        """
+        fx, fy = self.focus
+        radius = self.spawn_radius
+        while True:
+            for _ in range(attempts):
+                cx = (fx + rng.randint(-radius, radius)) % self.cols
+                cy = (fy + rng.randint(-radius, radius)) % self.rows
+                if self.is_free(cx, cy):
+                    return cx, cy
+            if 2 * radius + 1 >= max(self.cols, self.rows):
+                raise BoardFullError("no free cell found in the world")
+            radius *= 2
+
+    def chunks_in_view(self, cx, cy, view_cols, view_rows):
+        """Chunks overlapping the view whose top-left cell is (cx, cy), with wrap-around."""
+        size = self.chunk_size
+        # Walk cell by cell: a partial chunk at the world's edge is narrower
+        xs = {((cx + dx) % self.cols) // size for dx in range(view_cols + 1)}
+        ys = {((cy + dy) % self.rows) // size for dy in range(view_rows + 1)}
+        return [self.chunk(chx, chy) for chy in ys for chx in xs]